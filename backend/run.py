@@ -1,6 +1,9 @@
-from src import create_app
+from src import create_app, init_database
 
 app = create_app()
 
 if __name__ == "__main__":
+    # Development server: prepare the database here; deployments run `flask init-db`
+    with app.app_context():
+        init_database()
     app.run(debug=True, host="0.0.0.0", port="5000")
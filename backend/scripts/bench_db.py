@@ -0,0 +1,105 @@
+"""
+Concurrent read/write benchmark for the database engine profiles.
+
+Runs reader and writer threads against one database for a fixed time,
+first with SQLAlchemy's defaults and then with the profile from
+`src/utils/db_engine.py`, and reports throughput, p95 latency and errors
+(e.g. "database is locked") for each.
+
+Usage (from the backend directory):
+    python scripts/bench_db.py                          # temporary SQLite file
+    python scripts/bench_db.py --url postgresql://...   # PostgreSQL
+    python scripts/bench_db.py --readers 8 --writers 2 --seconds 10 --worker-class gthread --threads 8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import Config  # noqa: E402
+from src.utils.db_engine import engine_options, apply_sqlite_pragmas  # noqa: E402
+
+SETUP = [
+    "DROP TABLE IF EXISTS bench_rows",
+    "CREATE TABLE bench_rows (id INTEGER PRIMARY KEY, payload VARCHAR(200), created_at FLOAT)",
+]
+
+
+def make_engine(url, tuned, args):
+    if not tuned:
+        return create_engine(url)
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config.update(SQLALCHEMY_DATABASE_URI=url, WORKER_CLASS=args.worker_class, WORKER_THREADS=args.threads)
+    engine = create_engine(url, **engine_options(config))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", lambda conn, _: apply_sqlite_pragmas(conn, Config.SQLITE_PRAGMAS))
+    return engine
+
+
+def worker(engine, write, deadline, latencies, errors):
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                if write:
+                    conn.execute(text("INSERT INTO bench_rows (payload, created_at) VALUES (:p, :t)"),
+                                 {"p": "x" * 150, "t": time.time()})
+                else:
+                    conn.execute(text("SELECT id, payload FROM bench_rows ORDER BY id DESC LIMIT 50")).all()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:  # Count and keep going, like a request handler would
+            errors.append(type(e).__name__)
+
+
+def run(url, tuned, args):
+    engine = make_engine(url, tuned, args)
+    with engine.begin() as conn:
+        for statement in SETUP:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO bench_rows (payload, created_at) VALUES (:p, :t)"),
+                     [{"p": "seed", "t": 0.0}] * 1000)
+
+    deadline = time.monotonic() + args.seconds
+    results = {"read": ([], []), "write": ([], [])}
+    threads = [
+        threading.Thread(target=worker, args=(engine, kind == "write", deadline, *results[kind]))
+        for kind, count in (("read", args.readers), ("write", args.writers)) for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(f"{'tuned' if tuned else 'default'} profile:")
+    for kind, (latencies, errors) in results.items():
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else float("nan")
+        print(f"  {kind:>5}: {len(latencies) / args.seconds:8.0f} ops/s, p95 {p95:7.2f} ms, {len(errors)} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--worker-class", default="gthread", choices=["sync", "gthread", "gevent"])
+    parser.add_argument("--threads", type=int, default=8, help="Threads per worker for gthread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for tuned in (False, True):
+            url = args.url or f"sqlite:///{os.path.join(tmp, f'bench_{int(tuned)}.db')}"
+            run(url, tuned, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare the encode time and size of market listing responses per format.
+
+Builds a synthetic page of formatted coins (the shape `transform_data`
+returns) and renders it through `respond` with each Accept header and
+layout, exactly as the home, search and watchlist endpoints do. Sizes are
+reported raw and gzipped, since the compressor usually sits in front.
+
+Usage (from the backend directory):
+    python scripts/bench_serialization.py                 # 5000 coins
+    python scripts/bench_serialization.py --coins 100 --repeat 200
+"""
+
+import argparse
+import gzip
+import os
+import random
+import statistics
+import sys
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.data_format_utils import transform_data  # noqa: E402
+from src.utils.response_format import respond, msgpack  # noqa: E402
+
+CASES = (
+    ("jsonify (before)", "application/json", None),
+    ("json columnar", "application/json", "columnar"),
+    ("msgpack", "application/msgpack", None),
+    ("msgpack columnar", "application/msgpack", "columnar"),
+)
+
+
+def listing(count):
+    rnd = random.Random(42)
+    items = []
+    for i in range(1, count + 1):
+        price = 60000 / i ** 1.5
+        items.append({
+            "id": i, "name": f"Coin {i}", "symbol": f"C{i}", "circulating_supply": rnd.uniform(1e6, 1e10),
+            "quote": {"USD": {
+                "price": price, "volume_24h": rnd.uniform(1e3, 1e10),
+                "percent_change_1h": rnd.uniform(-5, 5), "percent_change_24h": rnd.uniform(-20, 20),
+                "percent_change_7d": rnd.uniform(-50, 50), "market_cap": price * rnd.uniform(1e6, 1e9),
+            }},
+        })
+    return {"page": 1, "limit": count, "total": count, "data": transform_data(items)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if msgpack is None:
+        sys.exit("msgpack is not installed: pip install -r requirements.txt")
+    app = Flask(__name__)
+    payload = listing(args.coins)
+    print(f"{args.coins} coins, median of {args.repeat} runs")
+    print(f"{'format':<18} {'encode ms':>10} {'bytes':>10} {'gzip bytes':>11}")
+    for name, accept, layout in CASES:
+        query = f"?layout={layout}" if layout else ""
+        with app.test_request_context(f"/{query}", headers={"Accept": accept}):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                body = respond(payload).get_data()
+                timings.append(time.perf_counter() - start)
+        print(f"{name:<18} {statistics.median(timings) * 1000:10.2f} {len(body):10d} "
+              f"{len(gzip.compress(body, compresslevel=6)):11d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure how long a fresh worker takes to import the app and build it.
+
+Each run starts a new interpreter, like a gunicorn worker boot, and times
+`import src` and `create_app()` separately. With --imports the slowest
+modules reported by `python -X importtime` are listed as well.
+
+Usage (from the backend directory, with the app's environment variables set):
+    python scripts/bench_startup.py --runs 10 --imports 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time
+t0 = time.perf_counter()
+import src
+t1 = time.perf_counter()
+src.create_app()
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    import_s, create_s = (float(value) for value in output.split()[-2:])
+    return import_s, create_s
+
+
+def slowest_imports(limit):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src; src.create_app()"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative), name.strip()))
+    # Top-level packages only: nested entries are already included in their parent
+    top = {}
+    for cumulative, name in rows:
+        root = name.split(".")[0]
+        top[root] = max(top.get(root, 0), cumulative)
+    return sorted(top.items(), key=lambda item: -item[1])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--imports", type=int, default=0, help="List the N slowest top-level imports.")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    for label, values in (("import src", [s[0] for s in samples]),
+                          ("create_app()", [s[1] for s in samples]),
+                          ("total", [s[0] + s[1] for s in samples])):
+        values_ms = [value * 1000 for value in values]
+        print(f"{label:>13}: median {statistics.median(values_ms):7.1f} ms, "
+              f"min {min(values_ms):7.1f} ms, max {max(values_ms):7.1f} ms")
+
+    if args.imports:
+        print("\nSlowest top-level imports (cumulative):")
+        for name, micros in slowest_imports(args.imports):
+            print(f"  {micros / 1000:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
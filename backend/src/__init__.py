@@ -2,9 +2,18 @@ from flask import Flask
 from flask_caching import Cache
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from passlib.context import CryptContext
 from .config import config
+from .utils.password_hasher import PasswordHasher
+from .utils.login_throttle import LoginThrottle
+from .utils.image_processing import ImageProcessor
+from .utils.price_alerts import PriceAlertIndex
+from .utils.metrics import Metrics
+from .utils.sql_profiler import SqlProfiler
+from .utils.compression import Compressor
+from .utils.db_engine import engine_options, configure_engines
+from .utils.db_replicas import RoutingSession, ReplicaRouter
+from .utils.market_snapshot import MarketListing
+from .utils.batch import BatchDispatcher
 import os
 from dotenv import load_dotenv
 from flask_cors import CORS
@@ -13,12 +22,20 @@ from flask_cors import CORS
 load_dotenv()
 
 # Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+password_hasher = PasswordHasher()
 jwt = JWTManager()
 
 cache = Cache()
+login_throttle = LoginThrottle(cache)
+image_processor = ImageProcessor()
+price_alerts = PriceAlertIndex()
+metrics = Metrics()
+sql_profiler = SqlProfiler()
+compressor = Compressor()
+replica_router = ReplicaRouter(cache)
+market_listing = MarketListing()
+batch_dispatcher = BatchDispatcher()
 
 
 def create_app():
@@ -38,23 +55,37 @@ def create_app():
     if env not in config:
         raise ValueError(f"Invalid FLASK_ENV value: {env}")
     app.config.from_object(config[env])
+    if app.config.get("PROXY_COUNT"):
+        # Take the client address from the trusted proxies' headers (login throttle, logs)
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        proxies = app.config["PROXY_COUNT"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
     if not os.path.exists(app.config['UPLOAD_FOLDER']):
         os.makedirs(app.config['UPLOAD_FOLDER'])
 
     # Initialize Flask extensions
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
     db.init_app(app)
-    migrate.init_app(app, db)
+    configure_engines(app, db)
+    if os.getenv("FLASK_RUN_FROM_CLI"):
+        # Only `flask db ...` needs Flask-Migrate; importing alembic slows every worker boot
+        from flask_migrate import Migrate
+        Migrate(app, db)
     jwt.init_app(app)
     cache.init_app(app)
+    password_hasher.init_app(app)
+    login_throttle.init_app(app)
+    image_processor.init_app(app)
+    price_alerts.init_app(app)
+    metrics.init_app(app)
+    sql_profiler.init_app(app)
+    compressor.init_app(app)
+    replica_router.init_app(app)
+    market_listing.init_app(app)
+    batch_dispatcher.init_app(app)
 
     # Import models to ensure they are registered with SQLAlchemy
     import src.models
-    with app.app_context():
-        db.create_all()
-        # Seed roles and admin user
-        from src.utils.user_role_utils import seed_admin_user, seed_roles
-        seed_roles()
-        seed_admin_user()
 
     # Register blueprints
     from src.routes.auth import auth_blueprint
@@ -65,5 +96,41 @@ def create_app():
     app.register_blueprint(main_blueprint)
     from src.routes.user import user_blueprint
     app.register_blueprint(user_blueprint)
+    from src.routes.uploads import uploads_blueprint
+    app.register_blueprint(uploads_blueprint)
+    from src.routes.metrics import metrics_blueprint
+    app.register_blueprint(metrics_blueprint)
+
+    from src.cli import register_commands
+    register_commands(app)
 
     return app
+
+
+def init_database():
+    """
+    Create missing tables and indexes and seed the roles and admin user.
+    Adds the columns and the watchlist unique index that tables created by
+    older releases lack, dropping duplicate watchlist rows.
+
+    Safe to run repeatedly. Workers do not call this; run `flask init-db`
+    once per deployment. Must run inside an application context.
+
+    :raises ValueError: If the admin user's environment variables are missing
+    """
+    db.create_all()
+    # Columns added to tables that older releases created
+    from src.models import Tip
+    from src.utils.schema_upgrade import add_missing_columns, backfill_excerpts
+    if "excerpt" in add_missing_columns(Tip, ["excerpt", "renditions"]):
+        backfill_excerpts()
+    db.session.commit()
+    # Seed roles and admin user
+    from src.utils.user_role_utils import seed_admin_user, seed_roles
+    seed_roles()
+    seed_admin_user()
+    from src.utils.tip_search import ensure_search_index
+    ensure_search_index()
+    from src.utils.watch_counts import ensure_watchlist_unique_index
+    ensure_watchlist_unique_index()
+    db.session.commit()
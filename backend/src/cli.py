@@ -0,0 +1,139 @@
+"""
+This module defines the Flask CLI commands for the application.
+
+Commands:
+- flask init-db: Create tables and seed roles and the admin user.
+- flask provision-users FILE: Create users in bulk from an NDJSON file.
+- flask reindex-tips: Rebuild the full-text search index over tips.
+- flask backfill-tip-excerpts: Compute missing listing excerpts.
+- flask gc-uploads: Delete uploaded images no tip references.
+- flask import-tips FILE: Import tips from an NDJSON or CSV file.
+- flask rebuild-watch-counts: Recompute per-coin watcher counts.
+- flask refresh-market: Fetch the market listing and write its snapshot.
+"""
+
+import json
+import os
+
+import click
+from flask import current_app
+
+
+@click.command("init-db")
+def init_db_command():
+    """Create missing tables and seed roles and the admin user (idempotent)."""
+    from src import init_database
+
+    init_database()
+    click.echo("Database initialized.")
+
+
+@click.command("provision-users")
+@click.argument("source", type=click.File("r"))
+@click.option("--chunk-size", type=int, default=None, help="Input lines per transaction.")
+def provision_users_command(source, chunk_size):
+    """Create users from an NDJSON file ('-' reads from stdin)."""
+    from src.utils.user_provisioning import provision_users
+
+    summary = provision_users(source, chunk_size or current_app.config["BULK_PROVISION_CHUNK_SIZE"])
+    click.echo(json.dumps(summary, indent=2))
+
+
+@click.command("reindex-tips")
+def reindex_tips_command():
+    """Rebuild the full-text search index over tips."""
+    from src import db
+    from src.utils.tip_search import ensure_search_index, rebuild_search_index
+
+    ensure_search_index()
+    rebuild_search_index()
+    db.session.commit()
+    click.echo("Tip search index rebuilt.")
+
+
+@click.command("backfill-tip-excerpts")
+def backfill_tip_excerpts_command():
+    """Compute the listing excerpt for tips written before it existed."""
+    from src import db
+    from src.utils.schema_upgrade import backfill_excerpts
+
+    count = backfill_excerpts()
+    db.session.commit()
+    click.echo(f"Backfilled {count} tip excerpts.")
+
+
+@click.command("gc-uploads")
+@click.option("--dry-run", is_flag=True, help="Only list the files that would be deleted.")
+def gc_uploads_command(dry_run):
+    """Delete uploaded images that no tip references."""
+    from src.utils.image_store import collect_orphans
+
+    result = collect_orphans(dry_run=dry_run)
+    for name in result["removed"]:
+        click.echo(name)
+    action = "Would reclaim" if dry_run else "Reclaimed"
+    click.echo(f"{action} {result['bytes']} bytes in {len(result['removed'])} files.")
+
+
+@click.command("import-tips")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default=None,
+              help="Input format; guessed from the file extension by default.")
+@click.option("--chunk-size", type=int, default=None, help="Records per transaction.")
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None,
+              help="File recording progress; an existing one resumes the import.")
+def import_tips_command(source, fmt, chunk_size, checkpoint):
+    """Import tips from an NDJSON or CSV file ('-' reads from stdin)."""
+    from src.utils.tip_import import iter_records, import_tips
+
+    fmt = fmt or ("csv" if source.name.endswith(".csv") else "ndjson")
+    start_after = 0
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            start_after = json.load(f)["checkpoint"]
+        click.echo(f"Resuming after record {start_after}.")
+
+    chunk_size = chunk_size or current_app.config["TIP_IMPORT_CHUNK_SIZE"]
+    for event in import_tips(iter_records(source, fmt), chunk_size, start_after):
+        if checkpoint:
+            with open(checkpoint, "w") as f:
+                json.dump({"checkpoint": event["checkpoint"]}, f)
+        if event["event"] == "progress":
+            click.echo(f"Committed through record {event['checkpoint']}: "
+                       f"{event['imported']} imported, {event['errors']} errors.")
+        else:
+            click.echo(json.dumps({key: event[key] for key in ("imported", "errors", "checkpoint")}, indent=2))
+
+
+@click.command("rebuild-watch-counts")
+def rebuild_watch_counts_command():
+    """Recompute per-coin watcher counts from the watchlist table."""
+    from src import db
+    from src.utils.watch_counts import rebuild_watch_counts
+
+    count = rebuild_watch_counts()
+    db.session.commit()
+    click.echo(f"Rebuilt watcher counts for {count} coins.")
+
+
+@click.command("refresh-market")
+def refresh_market_command():
+    """Fetch the market listing from CoinMarketCap and write its snapshot."""
+    from src import market_listing
+
+    snapshot = market_listing.refresh()
+    if snapshot is None:
+        raise click.ClickException("Failed to fetch the market listing from CoinMarketCap.")
+    click.echo(f"Saved {len(snapshot)} coins to {market_listing.path or 'memory'}.")
+
+
+def register_commands(app):
+    """Attach the CLI commands to the Flask app."""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(provision_users_command)
+    app.cli.add_command(reindex_tips_command)
+    app.cli.add_command(backfill_tip_excerpts_command)
+    app.cli.add_command(gc_uploads_command)
+    app.cli.add_command(import_tips_command)
+    app.cli.add_command(rebuild_watch_counts_command)
+    app.cli.add_command(refresh_market_command)
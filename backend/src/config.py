@@ -21,16 +21,105 @@ class Config:
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static/uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5 MB
+    # Max edge in pixels of each generated image rendition (plus a WebP copy)
+    IMAGE_RENDITIONS = {'large': 1024, 'medium': 640, 'small': 320}
+    IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', 2))
+    # Uploads touched more recently than this are never garbage collected
+    UPLOAD_GC_GRACE_SECONDS = 600
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
     CACHE_TYPE = 'SimpleCache'
     # Cache data for 5 minutes
     CACHE_DEFAULT_TIMEOUT = 300
+    # Rendered public tip responses; invalidated by admin writes
+    TIPS_CACHE_TIMEOUT = 3600
+    # Password hashing cost and worker pool
+    PASSWORD_HASH_ROUNDS = int(os.getenv('PASSWORD_HASH_ROUNDS', 29000))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0))  # 0 = min(4, CPU count)
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    # Login attempts allowed per sliding window, checked before any hashing
+    LOGIN_THROTTLE_ENABLED = True
+    LOGIN_THROTTLE_WINDOW = 60  # seconds
+    LOGIN_THROTTLE_IP_LIMIT = int(os.getenv('LOGIN_THROTTLE_IP_LIMIT', 20))
+    LOGIN_THROTTLE_EMAIL_LIMIT = int(os.getenv('LOGIN_THROTTLE_EMAIL_LIMIT', 5))
+    LOGIN_THROTTLE_MAX_KEYS = 10000
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto/-Host are trusted;
+    # 0 uses the socket address, which behind a proxy is the proxy's for every client
+    PROXY_COUNT = int(os.getenv('PROXY_COUNT', 0))
+    # Input lines per transaction for bulk user provisioning
+    BULK_PROVISION_CHUNK_SIZE = 500
+    # Records per transaction for bulk tip imports
+    TIP_IMPORT_CHUNK_SIZE = 500
+    # Active price alerts a single user may hold
+    PRICE_ALERTS_PER_USER = int(os.getenv('PRICE_ALERTS_PER_USER', 100))
+    # Seconds to wait for a CoinMarketCap answer
+    COINMARKETCAP_TIMEOUT = float(os.getenv('COINMARKETCAP_TIMEOUT', 10))
+    # Seconds a per-coin quote stays cached
+    QUOTE_CACHE_TIMEOUT = 60
+    # Upstream quote calls are topped up to this many ids with the most watched coins
+    QUOTE_PREFETCH_SIZE = int(os.getenv('QUOTE_PREFETCH_SIZE', 100))
+    MOST_WATCHED_CACHE_TIMEOUT = 60
+    # Shared market listing for the home page and search, see utils/market_snapshot.py
+    MARKET_SNAPSHOT_PATH = os.getenv('MARKET_SNAPSHOT_PATH', os.path.join(BASE_DIR, 'data/market_snapshot.bin'))
+    # CoinMarketCap bills 1 credit per 200 coins per refresh: 200 every 60 s is 1440 credits a day
+    MARKET_LISTING_LIMIT = int(os.getenv('MARKET_LISTING_LIMIT', 200))
+    MARKET_LISTING_TIMEOUT = int(os.getenv('MARKET_LISTING_TIMEOUT', 60))  # seconds before the listing is refreshed
+    MARKET_LISTING_RETRY = 15  # seconds to wait after a failed refresh
+    # Market overview: gainers/losers per period, among coins trading at least this much a day (USD)
+    MARKET_MOVERS_TOP_N = 10
+    MARKET_MOVERS_MIN_VOLUME = 50000
+    # /api/v1/batch: sub-requests per batch, and threads running them per worker process
+    BATCH_MAX_REQUESTS = 10
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 4))
+    BATCH_TIMEOUT = float(os.getenv('BATCH_TIMEOUT', 10))  # seconds per batch
+    # Shared directory where each worker writes its metrics for /metrics to sum
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    METRICS_FLUSH_INTERVAL = 5
+    # /metrics requires "Authorization: Bearer <token>"; without a token it is
+    # disabled unless METRICS_PUBLIC (the default in development only)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'false').lower() == 'true'
+    # Response compression: bodies smaller than this are sent uncompressed
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+    # Database engine profile, see utils/db_engine.py. WORKER_CLASS/WORKER_THREADS
+    # should match the gunicorn worker model; they size the PostgreSQL pool.
+    WORKER_CLASS = os.getenv('WORKER_CLASS', 'sync')
+    WORKER_THREADS = int(os.getenv('WORKER_THREADS', 1))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0)) or None
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW')) if os.getenv('DB_MAX_OVERFLOW') else None
+    DB_POOL_MAX_CONCURRENCY = 10  # gevent: connections a worker's greenlets may share
+    DB_POOL_TIMEOUT = 10
+    DB_POOL_PRE_PING = True
+    DB_POOL_RECYCLE = 1800
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -20000,  # KiB
+        'temp_store': 'MEMORY',
+    }
+    # Read replicas for the SELECTs of GET requests, see utils/db_replicas.py
+    SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if uri.strip()]
+    REPLICA_HEALTH_INTERVAL = 10  # seconds between health checks of a replica
+    REPLICA_CONNECT_TIMEOUT = int(os.getenv('REPLICA_CONNECT_TIMEOUT', 2))  # seconds
+    REPLICA_MAX_LAG = int(os.getenv('REPLICA_MAX_LAG', 5))  # seconds
+    # A client that just wrote reads from the primary for this long
+    REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
 
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv('DEV_DATABASE_URL')
+    # Per-request SQL profile headers and N+1 warnings, see utils/sql_profiler.py
+    SQL_PROFILER = os.getenv('SQL_PROFILER', 'true').lower() == 'true'
+    SQL_PROFILER_DUPLICATE_THRESHOLD = 3
+    METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'true').lower() == 'true'
+    # The development server handles each request in its own thread
+    WORKER_CLASS = os.getenv('WORKER_CLASS', 'gthread')
+    WORKER_THREADS = int(os.getenv('WORKER_THREADS', 4))
 
 
 class ProductionConfig(Config):
@@ -44,6 +133,10 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL')
     WTF_CSRF_ENABLED = False  # Disable CSRF in testing
+    PASSWORD_HASH_ROUNDS = int(os.getenv('PASSWORD_HASH_ROUNDS', 1000))
+    IMAGE_PROCESSING_WORKERS = 0  # Process uploads inline
+    BATCH_WORKERS = 0  # Run batch sub-requests inline
+    DB_POOL_PRE_PING = False
 
 
 # Now, you can choose which configuration to use by setting the FLASK_ENV environment variable
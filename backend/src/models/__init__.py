@@ -1,10 +1,14 @@
 from src.models.users import User, Role, UserRole
 from src.models.auth import TokenBlocklist
 from  src.models.tips import Tip
+from src.models.alerts import PriceAlert
+from src.models.cache_versions import CacheVersion
 __all__ = [
     "User",
     "TokenBlocklist",
     "Role",
     "UserRole",
-    'Tip'
+    'Tip',
+    'PriceAlert',
+    'CacheVersion'
 ]
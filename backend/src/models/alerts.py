@@ -0,0 +1,25 @@
+from datetime import datetime
+from src import db
+
+
+class PriceAlert(db.Model):
+    """A user's request to be told when a coin's USD price crosses a threshold."""
+    __tablename__ = 'price_alerts'
+    __table_args__ = (
+        # Loading the in-memory alert index reads only active alerts
+        db.Index('ix_price_alerts_active_coin', 'is_active', 'coin_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    coin_id = db.Column(db.Integer, nullable=False)
+    direction = db.Column(db.String(5), nullable=False)  # "above" or "below"
+    threshold = db.Column(db.Float, nullable=False)
+    is_active = db.Column(db.Boolean, default=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    triggered_at = db.Column(db.DateTime, nullable=True)
+    triggered_price = db.Column(db.Float, nullable=True)
+
+    user = db.relationship('User', back_populates='price_alerts')
+
+    def __repr__(self):
+        return f'<PriceAlert {self.coin_id} {self.direction} {self.threshold}>'
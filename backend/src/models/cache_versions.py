@@ -0,0 +1,11 @@
+from src import db
+
+
+class CacheVersion(db.Model):
+    """Current version token of a versioned cache, shared by every worker."""
+    __tablename__ = 'cache_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.String(32), nullable=False)
+
+    def __repr__(self):
+        return f'<CacheVersion {self.name} {self.version}>'
@@ -4,14 +4,27 @@ from src import db
 
 class Tip(db.Model):
     __tablename__ = 'tips'
+    __table_args__ = (
+        # Keyset pagination: newest first, optionally filtered by is_active
+        db.Index('ix_tips_active_created_id', 'is_active', 'created_at', 'id'),
+        db.Index('ix_tips_created_id', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=False)  # Stores HTML from ReactQuill
+    excerpt = db.Column(db.String(300), nullable=True)  # Plain-text teaser for listings
     category = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     image = db.Column(db.String(255), nullable=True)  # Store image URL or path
+    renditions = db.Column(db.JSON, nullable=True)  # Sized/WebP variants of image, see ImageProcessor
     is_active = db.Column(db.Boolean, default=True)
 
+    @property
+    def thumbnail(self):
+        """URL of the small rendition, or the original image until it is ready."""
+        small = (self.renditions or {}).get('small')
+        return small['url'] if small else self.image
+
     def __repr__(self):
         return f'<Tip {self.title}>'
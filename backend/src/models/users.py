@@ -1,6 +1,6 @@
 from sqlalchemy.ext.hybrid import hybrid_property
 
-from src import db, pwd_context
+from src import db, password_hasher
 
 
 class User(db.Model):
@@ -12,6 +12,7 @@ class User(db.Model):
     _password = db.Column('password', db.String(255), nullable=False)
     roles = db.relationship("Role", secondary="user_roles", back_populates="users")
     watchlist = db.relationship('Watchlist', foreign_keys='Watchlist.user_id', back_populates='user', cascade='all, delete-orphan')
+    price_alerts = db.relationship('PriceAlert', back_populates='user', cascade='all, delete-orphan')
 
     @hybrid_property
     def password(self):
@@ -19,7 +20,7 @@ class User(db.Model):
 
     @password.setter
     def password(self, value):
-        self._password = pwd_context.hash(value)
+        self._password = password_hasher.hash(value)
 
     def has_role(self, role):
         return bool(
@@ -47,7 +48,21 @@ class UserRole(db.Model):
 
 class Watchlist(db.Model):
     __tablename__ = 'watchlist'
+    __table_args__ = (
+        # Also serves as the (user_id, coin_id) lookup index
+        db.UniqueConstraint('user_id', 'coin_id', name='uq_watchlist_user_coin'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     coin_id = db.Column(db.Integer)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     user = db.relationship('User', foreign_keys=[user_id], back_populates='watchlist')
+
+
+class CoinWatchCount(db.Model):
+    """Number of users watching a coin, maintained alongside `watchlist` writes."""
+    __tablename__ = 'coin_watch_counts'
+    __table_args__ = (
+        db.Index('ix_coin_watch_counts_watchers', 'watchers', 'coin_id'),
+    )
+    coin_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    watchers = db.Column(db.Integer, nullable=False, default=0)
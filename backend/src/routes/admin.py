@@ -1,13 +1,23 @@
-from flask import request, jsonify, Blueprint
+import json
+
+from flask import request, jsonify, Blueprint, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
 from sqlalchemy.exc import NoResultFound
 
-from src import db
+from src import db, login_throttle, image_processor
 from src.models import Tip
 from src.utils.decorators import admin_required
 from src.schemas.tip import TipSchema
 from src.utils.handle_image_upload import handle_image_upload
+from src.utils.image_store import release_image
+from src.utils.tip_batch import apply_tip_operations
+from src.utils.tip_import import iter_records, import_tips, FORMATS
+from src.utils.user_provisioning import provision_users
+from src.utils.pagination import paginate
+from src.utils.tip_fields import parse_fields, load_only_fields, serialize_tip
+from src.utils.tip_cache import bump_tips_version, tip_count_key
+from src.utils.tip_search import index_tip, remove_tip
 
 admin_blueprint = Blueprint("admin", __name__, url_prefix="/api/v1/admin")
 
@@ -17,40 +27,28 @@ admin_blueprint = Blueprint("admin", __name__, url_prefix="/api/v1/admin")
 @admin_required
 def tips():
     """
-    Endpoint to fetch paginated tips for admin.
+    Endpoint to fetch paginated tips for admin, newest first.
+
+    Supports the same `cursor`, `page` and `fields` arguments as the public
+    listing.
     """
     try:
         get_jwt_identity()
     except Exception as e:
         return jsonify({'error': 'Authentication failed', 'details': str(e)}), 422
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
-        pagination = Tip.query.paginate(page=page, per_page=limit, error_out=False)
-
-        tips_data = pagination.items
+        fields = parse_fields(request.args.get('fields'))
+        query = Tip.query.options(load_only_fields(fields))
+        tips_data, meta = paginate(query, Tip, request.args, tip_count_key("all"))
 
         # Prepare the response with pagination metadata
         return jsonify({
-            "page": pagination.page,
-            "total_pages": pagination.pages,
-            "total_items": pagination.total,
-            "limit": limit,
-            "data": [
-                {
-                    "id": tip.id,
-                    "title": tip.title,
-                    "description": tip.description,
-                    "created_at": tip.created_at.isoformat(),
-                    "updated_at": tip.updated_at.isoformat(),
-                    "image": tip.image,
-                    "category": tip.category,
-                    "is_active": tip.is_active
-                }
-                for tip in tips_data
-            ]
+            **meta,
+            "data": [serialize_tip(tip, fields) for tip in tips_data]
         }), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except NoResultFound:
         return jsonify({"error": "No tips found"}), 404
     except Exception as e:
@@ -93,11 +91,16 @@ def create_tip():
     try:
         tip = Tip(**validated_data)
         db.session.add(tip)
+        db.session.flush()
+        index_tip(tip)
         db.session.commit()
+        bump_tips_version()
     except Exception as db_err:
         db.session.rollback()
         return jsonify({'error': 'Failed to save tip', 'details': str(db_err)}), 500
 
+    image_processor.submit(tip.id, tip.image)
+
     return jsonify({'message': 'Crypto tip created successfully', 'tip': tip.id}), 201
 
 
@@ -135,10 +138,19 @@ def edit_tip(tip_id):
     except ValidationError as err:
         return jsonify({'errors': err.messages}), 400
 
+    old_image = tip.image
+    new_image = validated_data.get('image') != old_image
     for key, value in validated_data.items():
         setattr(tip, key, value)
+    if new_image:
+        tip.renditions = None
 
+    index_tip(tip)
     db.session.commit()
+    bump_tips_version()
+    if new_image:
+        image_processor.submit(tip.id, tip.image)
+        release_image(old_image)
     return jsonify({'message': 'Crypto tip updated successfully', 'tip': tip.id}), 200
 
 
@@ -147,6 +159,98 @@ def edit_tip(tip_id):
 @admin_required
 def delete_tip(tip_id):
     tip = Tip.query.get_or_404(tip_id)
+    image = tip.image
+    remove_tip(tip.id)
     db.session.delete(tip)
     db.session.commit()
+    bump_tips_version()
+    release_image(image)
     return jsonify({'message': 'Crypto tip deleted successfully'}), 200
+
+
+@admin_blueprint.route('/tips/batch', methods=['POST'])
+@jwt_required()
+@admin_required
+def batch_tips():
+    """
+    Endpoint to apply many tip operations in a single transaction.
+
+    Request Body (JSON):
+    - operations (list): Items like {"id": 1, "action": "activate"}; actions are
+      activate, deactivate, set_category (with "category") and delete.
+
+    Returns:
+    - 200: Per-item results; failed items carry an "error".
+    - 400: The batch itself is malformed.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        results, deleted_images = apply_tip_operations(data.get('operations'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if any('error' not in result for result in results):
+        bump_tips_version()
+    for image in set(deleted_images):
+        release_image(image)
+    return jsonify({'results': results}), 200
+
+
+@admin_blueprint.route('/tips/import', methods=['POST'])
+@jwt_required()
+@admin_required
+def import_tips_endpoint():
+    """
+    Endpoint to import tips from an NDJSON or CSV body.
+
+    Query Parameters:
+    - format: "ndjson" (default) or "csv" with a header row.
+    - start_after: Checkpoint from an interrupted import; earlier records are skipped.
+
+    Returns:
+    - 200: An NDJSON stream of progress events, one per committed chunk,
+      ending with a "done" event carrying the errors.
+    - 400: Unknown format or malformed checkpoint.
+    """
+    fmt = request.args.get('format', 'csv' if request.mimetype == 'text/csv' else 'ndjson')
+    if fmt not in FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(FORMATS)}"}), 400
+    try:
+        start_after = int(request.args.get('start_after', 0))
+    except ValueError:
+        return jsonify({'error': 'start_after must be an integer'}), 400
+
+    events = import_tips(iter_records(request.stream, fmt), current_app.config['TIP_IMPORT_CHUNK_SIZE'], start_after)
+    return Response(stream_with_context(json.dumps(event) + "\n" for event in events),
+                    mimetype='application/x-ndjson')
+
+
+@admin_blueprint.route('/login_throttle', methods=['GET'])
+@jwt_required()
+@admin_required
+def login_throttle_metrics():
+    """
+    Endpoint to report login throttle counters for this worker.
+    """
+    return jsonify(login_throttle.metrics()), 200
+
+
+@admin_blueprint.route('/users/bulk', methods=['POST'])
+@jwt_required()
+@admin_required
+def bulk_provision_users():
+    """
+    Endpoint to create many users from an NDJSON body.
+
+    Each line is a JSON object with `name`, `email`, `password` and an optional
+    `role` (`user` by default). The body is read as a stream and committed in
+    chunks of BULK_PROVISION_CHUNK_SIZE lines.
+
+    Returns:
+    - 201: Users were created; the summary lists skipped and invalid lines.
+    - 200: Every valid line was a user that already exists.
+    - 400: No line was a valid user record.
+    """
+    summary = provision_users(request.stream, current_app.config['BULK_PROVISION_CHUNK_SIZE'])
+    status = 201 if summary['created'] else 200 if summary['skipped'] else 400
+    return jsonify(summary), status
@@ -27,9 +27,11 @@ from flask_jwt_extended import (
     get_jwt_identity, unset_jwt_cookies
 )
 
-from src import db, jwt
+from src import db, jwt, login_throttle
 from src.schemas.user_login_schema import UserLoginSchema
 from src.utils.user_role_utils import assign_role_to_user
+from src.utils.password_hasher import PasswordHasherBusy
+from src.utils.batch import batch_identity
 
 auth_blueprint = Blueprint("auth", __name__, url_prefix="/api/v1/auth")
 
@@ -47,6 +49,7 @@ def register():
     Returns:
     - 201: Success message if the user is registered.
     - 400: Validation error messages if the input is invalid.
+    - 503: The password hashing queue is full.
     - 500: Error message for unexpected exceptions.
     """
     if not request.is_json:
@@ -62,6 +65,8 @@ def register():
         return jsonify({"message": "User registered successfully"}), 201
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 400
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -74,6 +79,13 @@ def login():
     schema = UserLoginSchema()
     try:
         data = schema.load(request.json)
+
+        # Reject over-limit attempts before spending CPU on a password verify
+        retry_after = login_throttle.check(request.remote_addr, data.get("email"))
+        if retry_after:
+            return jsonify({"msg": "Too many login attempts, try again later."}), 429, \
+                {"Retry-After": str(retry_after)}
+
         user = schema.validate_credentials(data)
 
         access_token = create_access_token(identity=user.id)
@@ -95,6 +107,8 @@ def login():
 
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 400
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 
 
 @auth_blueprint.route("/refresh", methods=["POST"])
@@ -186,6 +200,10 @@ def user_loader_callback(jwt_header, jwt_payload):
     Returns:
     - User: The user instance corresponding to the identity claim.
     """
+    shared = batch_identity(jwt_payload)
+    if shared is not None and shared.user is not None:
+        # Loaded once by the enclosing batch request
+        return db.session.merge(shared.user, load=False)
     identity = jwt_payload[current_app.config['JWT_IDENTITY_CLAIM']]
     return User.query.get(identity)
 
@@ -201,6 +219,8 @@ def check_if_token_revoked(jwt_header, jwt_payload):
     Returns:
     - bool: True if the token is revoked, False otherwise.
     """
+    if batch_identity(jwt_payload) is not None:
+        return False  # Checked once by the enclosing batch request
     return is_token_revoked(jwt_payload)
 
 
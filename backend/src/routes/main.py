@@ -1,17 +1,26 @@
-from flask import request, jsonify, Blueprint, current_app
+import json
+
+from flask import request, jsonify, Blueprint, current_app, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_current_user
+from marshmallow import ValidationError
 from sqlalchemy.exc import NoResultFound
-from src import cache
-import requests
-import os
+from src import db, price_alerts, market_listing, batch_dispatcher
 
 from src.models import Tip
+from src.schemas.batch import BatchSchema
+from src.utils.batch import BatchIdentity
 from src.utils.data_format_utils import transform_data
+from src.utils.market_data import cmc_get
+from src.utils.market_overview import market_overview
+from src.utils.pagination import paginate
+from src.utils.response_format import respond, cached_response
+from src.utils.tip_fields import parse_fields, load_only_fields, serialize_tip
+from src.utils.tip_cache import cached_tips_view, tip_count_key
+from src.utils.tip_search import search_tips
+from src.utils.watch_counts import most_watched
 
 main_blueprint = Blueprint("main", __name__, url_prefix="/api/v1")
 
-COIN_API_KEY = os.getenv('COIN_API_KEY')
-COIN_API_BASE_URL = "https://pro-api.coinmarketcap.com"
-
 
 @main_blueprint.route('/', methods=['GET'])
 def home():
@@ -21,19 +30,26 @@ def home():
     page = int(request.args.get('page', 1))
     limit = int(request.args.get('limit', 20))
     start = (page - 1) * limit
-    parameters = {
-        'start': start + 1,
-        'limit': limit,
-        'convert': 'USD'
-    }
-    cache_key = f"cryptocurrencies_page_{page}_limit_{limit}"
-    cached_data = cache.get(cache_key)
-    if not cached_data:
-        # Fetch data from CoinMarketCap API
-        headers = {'Accepts': 'application/json',
-                   "X-CMC_PRO_API_KEY": COIN_API_KEY}
-        response = requests.get(f"{COIN_API_BASE_URL}/v1/cryptocurrency/listings/latest", headers=headers,
-                                params=parameters)
+    snapshot = market_listing.get()
+    from_snapshot = snapshot is not None and snapshot.covers(start, start + limit)
+    # Snapshot pages are keyed by the snapshot, so a refresh is never served stale
+    cache_key = (f"home_{snapshot.fetched_at}_page_{page}_limit_{limit}" if from_snapshot
+                 else f"cryptocurrencies_page_{page}_limit_{limit}")
+    response = cached_response(cache_key)
+    if response is not None:
+        return response
+
+    if from_snapshot:
+        cryptocurrencies = snapshot.items(slice(start, start + limit))
+        total_count = snapshot.total_count
+    else:
+        # Pages past the shared listing are fetched on their own
+        parameters = {
+            'start': start + 1,
+            'limit': limit,
+            'convert': 'USD'
+        }
+        response = cmc_get("/v1/cryptocurrency/listings/latest", params=parameters)
 
         if response.status_code != 200:
             return jsonify({
@@ -45,20 +61,15 @@ def home():
         api_data = response.json()
         cryptocurrencies = api_data.get("data", [])
         total_count = api_data.get("status", {}).get("total_count", 0)
-
-        cache.set(cache_key, {"data": cryptocurrencies,
-                  "total_count": total_count}, timeout=60)
-    else:
-        cryptocurrencies = cached_data.get("data", [])
-        total_count = cached_data.get("total_count", 0)
+        price_alerts.evaluate(cryptocurrencies)
 
     transformed_data = transform_data(cryptocurrencies)
-    return jsonify({
+    return respond({
         "page": page,
         "limit": limit,
         "total": total_count,
         "data": transformed_data
-    }), 200
+    }, cache_key=cache_key)
 
 
 @main_blueprint.route('/coin/<coin_id>', methods=['GET'])
@@ -68,15 +79,8 @@ def get_coin_data(coin_id):
     and return current and historical data (if available).
     """
     try:
-        # Get current data for the coin
-        headers = {
-            'Accepts': 'application/json',
-            'X-CMC_PRO_API_KEY': COIN_API_KEY
-        }
-
         # Fetch current data for the coin
-        current_response = requests.get(f"{COIN_API_BASE_URL}/v2/cryptocurrency/info", headers=headers,
-                                        params={'id': coin_id})
+        current_response = cmc_get("/v2/cryptocurrency/info", params={'id': coin_id})
         current_data = current_response.json()
         coin_info = current_data.get('data', {}).get(coin_id, {})
 
@@ -89,47 +93,124 @@ def get_coin_data(coin_id):
         return jsonify({"error": str(e)}), 500
 
 
+@main_blueprint.route('/market/overview', methods=['GET'])
+def market_overview_endpoint():
+    """
+    Return the global market cap and 24h volume, BTC/ETH dominance and the
+    top gainers and losers over 1h, 24h and 7d, computed once per listing
+    refresh.
+    """
+    overview = market_overview()
+    if overview is None:
+        return jsonify({"error": "Failed to fetch data from CoinMarketCap API"}), 500
+    return jsonify(overview), 200
+
+
+@main_blueprint.route('/batch', methods=['POST'])
+def batch():
+    """
+    Run several GET requests in one round trip.
+
+    Body: {"requests": [{"id": "me", "path": "/api/v1/auth/me"}, ...]}.
+    The caller's token is verified once for the whole batch, and the
+    sub-requests run concurrently. The response lists, in request order,
+    {"id", "status", "body"} for each sub-request; a failing sub-request
+    does not fail the others.
+    """
+    try:
+        data = BatchSchema().load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+    max_requests = current_app.config["BATCH_MAX_REQUESTS"]
+    if len(data["requests"]) > max_requests:
+        return jsonify({"error": f"A batch holds at most {max_requests} requests"}), 400
+
+    # One authentication pass; an invalid token fails the whole batch
+    verify_jwt_in_request(optional=True)
+    jwt_data = get_jwt()
+    identity = BatchIdentity(jwt_data["jti"], get_current_user()) if jwt_data else None
+    # Keep the loaded user but return the connection to the pool while sub-requests run
+    db.session.close()
+    g.db_read_only = True
+
+    results = batch_dispatcher.dispatch(data["requests"], identity)
+    parts = []
+    for sub, (status, is_json, body) in zip(data["requests"], results):
+        # JSON bodies are spliced in as they are, not decoded and encoded again
+        payload = body.decode() if is_json and body.strip() else json.dumps(body.decode("utf-8", "replace"))
+        parts.append(f'{{"id":{json.dumps(sub["id"])},"status":{status},"body":{payload}}}')
+    return current_app.response_class(f'{{"responses":[{",".join(parts)}]}}\n', mimetype="application/json")
+
+
+@main_blueprint.route('/coins/most-watched', methods=['GET'])
+def most_watched_coins():
+    """
+    Return the coins on the most watchlists.
+
+    Query Parameters:
+    - limit (int, optional): Number of coins, 1 to 100 (default 10).
+    """
+    limit = request.args.get('limit', 10, type=int)
+    if not 1 <= limit <= 100:
+        return jsonify({"error": "limit must be between 1 and 100"}), 400
+    return jsonify({"data": most_watched(limit)}), 200
+
+
 @main_blueprint.route('/tips', methods=['GET'])
+@cached_tips_view
 def tips():
     """
-    Endpoint to fetch paginated tips.
+    Endpoint to fetch paginated tips, newest first.
+
+    Pass `cursor` (empty for the first page, then the returned `next_cursor`)
+    for keyset pagination, or `page` for numbered pages. `fields` selects a
+    comma-separated subset of tip fields; by default everything but the
+    full `description` is returned.
     """
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
-        pagination = Tip.query.filter_by(is_active=True).paginate(
-            page=page, per_page=limit, error_out=False)
-
-        tips_data = pagination.items
+        fields = parse_fields(request.args.get('fields'))
+        query = Tip.query.filter_by(is_active=True).options(load_only_fields(fields))
+        tips_data, meta = paginate(query, Tip, request.args, tip_count_key("active"))
 
         # Prepare the response with pagination metadata
         return jsonify({
-            "page": pagination.page,
-            "total_pages": pagination.pages,
-            "total_items": pagination.total,
-            "limit": limit,
-            "data": [
-                {
-                    "id": tip.id,
-                    "title": tip.title,
-                    "description": tip.description,
-                    "created_at": tip.created_at.isoformat(),
-                    "updated_at": tip.updated_at.isoformat(),
-                    "image": tip.image,
-                    "category": tip.category,
-                    "is_active": tip.is_active
-                }
-                for tip in tips_data
-            ]
+            **meta,
+            "data": [serialize_tip(tip, fields) for tip in tips_data]
         }), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except NoResultFound:
         return jsonify({"error": "No tips found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@main_blueprint.route('/tips/search', methods=['GET'])
+@cached_tips_view
+def search_tips_endpoint():
+    """
+    Full-text search over active tips, best matches first.
+
+    Matches in `title` and `excerpt` are wrapped in <mark> tags.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Search query is required"}), 400
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({"error": "page and limit must be integers"}), 400
+
+    try:
+        return jsonify(search_tips(query, page, limit)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @main_blueprint.route('/tips/<int:tip_id>', methods=['GET'])
+@cached_tips_view
 def show_tip(tip_id):
     """
     Endpoint to fetch tip information.
@@ -171,53 +252,29 @@ def search_cryptocurrencies():
 
     # Try to get from cache first
     cache_key = f"search_{query}_page_{page}_limit_{limit}"
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        return jsonify(cached_data)
-
-    # Fetch data from CoinMarketCap API
-    headers = {'Accepts': 'application/json',
-               "X-CMC_PRO_API_KEY": COIN_API_KEY}
-    response = requests.get(f"{COIN_API_BASE_URL}/v1/cryptocurrency/listings/latest",
-                            headers=headers,
-                            params={'limit': 5000, 'convert': 'USD'})
-
-    if response.status_code != 200:
-        return jsonify({
-            "error": "Failed to fetch data from CoinMarketCap API",
-            "status_code": response.status_code,
-            "message": response.json().get("status", {}).get("error_message", "Unknown error")
-        }), 500
+    response = cached_response(cache_key)
+    if response is not None:
+        return response
 
-    api_data = response.json()
-    cryptocurrencies = api_data.get("data", [])
+    snapshot = market_listing.get()
+    if snapshot is None:
+        return jsonify({"error": "Failed to fetch data from CoinMarketCap API"}), 500
 
     # 🔹 Search by name, symbol, or slug
-    filtered_cryptos = [
-        crypto for crypto in cryptocurrencies
-        if query in crypto['name'].lower() or query in crypto['symbol'].lower() or query in crypto['slug'].lower()
-    ]
+    matches = snapshot.search(query)
 
     # Pagination Logic
-    total_results = len(filtered_cryptos)
-    paginated_cryptos = filtered_cryptos[start:start + limit]
+    total_results = len(matches)
+    paginated_cryptos = snapshot.items(matches[start:start + limit])
 
     # Transform the filtered and paginated data
     transformed_data = transform_data(paginated_cryptos)
 
-    # Cache the results for 5 minutes
-    cache.set(cache_key, {
-        "page": page,
-        "limit": limit,
-        "total_results": total_results,
-        "total_pages": (total_results // limit) + (1 if total_results % limit > 0 else 0),
-        "data": transformed_data
-    }, timeout=60)
-
-    return jsonify({
+    # Cache the rendered results for a minute
+    return respond({
         "page": page,
         "limit": limit,
         "total_results": total_results,
         "total": (total_results // limit) + (1 if total_results % limit > 0 else 0),
         "data": transformed_data
-    })
+    }, cache_key=cache_key)
@@ -0,0 +1,33 @@
+"""
+This module exposes the application metrics to Prometheus.
+
+Routes:
+- /metrics: Histograms in the Prometheus text format, summed over all workers.
+"""
+
+import hmac
+
+from flask import Blueprint, Response, request, current_app
+
+from src import metrics
+
+metrics_blueprint = Blueprint("metrics", __name__)
+
+
+@metrics_blueprint.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """
+    Render the metrics. The scraper must send METRICS_TOKEN as a bearer
+    token; without a token the endpoint is only served if METRICS_PUBLIC.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    elif not current_app.config.get("METRICS_PUBLIC"):
+        return Response("Not Found\n", status=404, mimetype="text/plain")
+
+    response = Response(metrics.render(), mimetype="text/plain")
+    response.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    response.cache_control.no_store = True
+    return response
@@ -0,0 +1,52 @@
+"""
+This module serves uploaded images.
+
+Upload file names are content hashes and files are never rewritten, so
+responses are cacheable forever (`Cache-Control: immutable`). Files are sent
+with `send_from_directory`, which handles ETag/If-None-Match and Range
+requests and hands the open file to the WSGI server's `wsgi.file_wrapper`
+(sendfile under gunicorn). Set USE_X_SENDFILE to let a fronting nginx or
+Apache deliver the bytes instead.
+
+Clients that accept WebP get the WebP variant of a rendition when one exists.
+
+Routes:
+- /uploads/<filename>: Serve an uploaded image.
+"""
+
+import os
+
+from flask import Blueprint, request, current_app, send_from_directory, abort
+
+uploads_blueprint = Blueprint("uploads", __name__, url_prefix="/uploads")
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Partial files written by store_upload() and the image processor
+_INCOMPLETE_SUFFIXES = (".upload", ".tmp")
+
+
+def _accepts_webp():
+    """True if the client names image/webp explicitly; `*/*` does not count."""
+    return any(value == "image/webp" and quality > 0 for value, quality in request.accept_mimetypes)
+
+
+@uploads_blueprint.route("/<path:filename>", methods=["GET"])
+def serve_upload(filename):
+    """
+    Serve an uploaded image, negotiating WebP through the Accept header.
+    """
+    if filename.endswith(_INCOMPLETE_SUFFIXES) or "/" in filename:
+        abort(404)
+
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    stem, _, extension = filename.rpartition(".")
+    if extension != "webp" and _accepts_webp():
+        webp = f"{stem}.webp"
+        if os.path.isfile(os.path.join(upload_folder, webp)):
+            filename = webp
+
+    response = send_from_directory(upload_folder, filename, max_age=IMMUTABLE_MAX_AGE, conditional=True, etag=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add("Accept")
+    return response
@@ -1,45 +1,32 @@
 import logging
-import os
 
-import requests
-from flask import request, Blueprint, jsonify
+from flask import request, Blueprint, jsonify, current_app
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from marshmallow import ValidationError
 
 from src.utils.decorators import user_required
 
 from src.models.users import Watchlist
-from src.schemas.watchlist import WatchlistSchema
+from src.models.alerts import PriceAlert
+from src.schemas.alert import PriceAlertSchema
+from src.schemas.watchlist import WatchlistSchema, WatchlistBulkSchema
 from src.utils.data_format_utils import transform_data
-from src import db
-from sqlalchemy.exc import IntegrityError
+from src.utils.market_data import get_quotes
+from src.utils.response_format import respond
+from src.utils.watch_counts import increment_watch_counts, decrement_watch_counts, has_watchlist_unique_index
+from src import db, price_alerts
+from sqlalchemy import insert, delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
 
 user_blueprint = Blueprint("user", __name__, url_prefix="/api/v1/user")
-COIN_API_KEY = os.getenv('COIN_API_KEY')
-COIN_API_BASE_URL = "https://pro-api.coinmarketcap.com"
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def fetch_coinmarketcap_data(coin_ids):
-    """
-    Fetches data from the CoinMarketCap API for the given coin IDs.
-    """
-    try:
-        parameters = {'id': coin_ids}
-        headers = {'Accepts': 'application/json',
-                   "X-CMC_PRO_API_KEY": COIN_API_KEY}
-        response = requests.get(f"{COIN_API_BASE_URL}/v1/cryptocurrency/quotes/latest", headers=headers,
-                                params=parameters)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch data from CoinMarketCap API: {e}")
-        return None
-
-
 def get_user_watchlist(user_id):
     """
     Fetches the watchlist for the given user ID.
@@ -55,47 +42,66 @@ def watchlist():
     watchlist_coins = get_user_watchlist(user_id)
 
     if not watchlist_coins:
-        return jsonify([]), 200
+        return respond([])
 
-    # Extract coin IDs
-    coin_ids = ",".join(str(coin.coin_id) for coin in watchlist_coins)
-
-    # Fetch data from CoinMarketCap API
-    api_data = fetch_coinmarketcap_data(coin_ids)
-    if not api_data:
+    # Quotes come from the per-coin cache; only missing coins are fetched
+    coin_ids = [coin.coin_id for coin in watchlist_coins]
+    quotes = get_quotes(coin_ids)
+    if quotes is None:
         return jsonify({
             "error": "Failed to fetch data from CoinMarketCap API",
             "message": "Please try again later"
         }), 500
 
     # Transform and return the data
-    cryptocurrencies = api_data.get("data", {})
-    transformed_data = transform_data(cryptocurrencies)
-    return jsonify(transformed_data), 200
+    transformed_data = transform_data([quotes[coin_id] for coin_id in coin_ids if coin_id in quotes])
+    return respond(transformed_data)
 
 
-def find_watchlist(user_id, coin_id):
-    """
-    Checks if an entry already exists in the watchlist for the given user and coin.
+def add_to_watchlist(user_id, coin_ids):
     """
-    return Watchlist.query.filter_by(user_id=user_id, coin_id=coin_id).first() is not None
+    Adds coins to the watchlist with a single INSERT that skips coins the
+    user already watches, and counts the new watchers in the same transaction.
+    ON CONFLICT is only used once `watchlist` has its unique index; older
+    tables filter out existing coins first.
 
-
-def add_to_watchlist(user_id, coin_id):
+    :return: List of coin IDs that were actually added
     """
-    Adds a new entry to the watchlist.
+    rows = [{"user_id": user_id, "coin_id": coin_id} for coin_id in dict.fromkeys(coin_ids)]
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql") and has_watchlist_unique_index():
+        dialect_insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = dialect_insert(Watchlist).values(rows).on_conflict_do_nothing().returning(Watchlist.coin_id)
+        added = db.session.execute(statement).scalars().all()
+    else:
+        existing = {coin_id for (coin_id,) in db.session.query(Watchlist.coin_id).filter(
+            Watchlist.user_id == user_id, Watchlist.coin_id.in_([row["coin_id"] for row in rows]))}
+        rows = [row for row in rows if row["coin_id"] not in existing]
+        if rows:
+            db.session.execute(insert(Watchlist), rows)
+        added = [row["coin_id"] for row in rows]
+    increment_watch_counts(added)
+    db.session.commit()
+    if added:
+        logger.info(f"New watchlist entries added: user_id={user_id}, coin_ids={added}")
+    return added
+
+
+def remove_from_watchlist(user_id, coin_ids):
     """
-    try:
-        watchlist_entry = Watchlist(user_id=user_id, coin_id=coin_id)
-        db.session.add(watchlist_entry)
-        db.session.commit()
-        logger.info(
-            f"New watchlist entry added: user_id={user_id}, coin_id={coin_id}")
-        return True
-    except IntegrityError as e:
-        db.session.rollback()
-        logger.error(f"Database error while adding to watchlist: {e}")
-        return False
+    Removes coins from the watchlist with a single DELETE and drops their
+    watchers in the same transaction.
+
+    :return: List of coin IDs that were actually removed
+    """
+    removed = db.session.execute(
+        delete(Watchlist)
+        .where(Watchlist.user_id == user_id, Watchlist.coin_id.in_(coin_ids))
+        .returning(Watchlist.coin_id)
+    ).scalars().all()
+    decrement_watch_counts(removed)
+    db.session.commit()
+    return removed
 
 
 @user_blueprint.route("/watchlist", methods=["POST"])
@@ -116,17 +122,48 @@ def add_watchlist():
 
     coin_id = validated_data.get("coin_id")
 
-    # Check for duplicate entry
-    if find_watchlist(user_id, coin_id):
+    try:
+        added = add_to_watchlist(user_id, [coin_id])
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error while adding to watchlist: {e}")
+        return jsonify({"message": "Failed to add crypto to watchlist"}), 500
+
+    if not added:
         logger.warning(
             f"Duplicate entry detected: user_id={user_id}, coin_id={coin_id}")
         return jsonify({"message": "Crypto is already in the watchlist"}), 400
+    return jsonify({"message": "Crypto added to watchlist successfully"}), 201
 
-    # Add to watchlist
-    if add_to_watchlist(user_id, coin_id):
-        return jsonify({"message": "Crypto added to watchlist successfully"}), 201
-    else:
-        return jsonify({"message": "Failed to add crypto to watchlist"}), 500
+
+@user_blueprint.route("/watchlist/bulk", methods=["POST", "DELETE"])
+@jwt_required()
+@user_required
+def bulk_watchlist():
+    """
+    Add (POST) or remove (DELETE) a set of coins in one transaction.
+
+    Request Body (JSON):
+    - coin_ids (list[int]): The coins to add or remove.
+    """
+    user_id = get_jwt_identity()
+    try:
+        coin_ids = WatchlistBulkSchema().load(request.get_json(silent=True) or {})["coin_ids"]
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    try:
+        if request.method == "POST":
+            added = add_to_watchlist(user_id, coin_ids)
+            return jsonify({"added": added,
+                            "already_present": [c for c in dict.fromkeys(coin_ids) if c not in added]}), 200
+        removed = remove_from_watchlist(user_id, coin_ids)
+        return jsonify({"removed": removed,
+                        "not_found": [c for c in dict.fromkeys(coin_ids) if c not in removed]}), 200
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error while updating watchlist: {e}")
+        return jsonify({"message": "Failed to update watchlist"}), 500
 
 
 @user_blueprint.route("/watchlist/<int:coin_id>", methods=["DELETE"])
@@ -134,9 +171,80 @@ def add_watchlist():
 @user_required
 def delete_watchlist(coin_id):
     user_id = get_jwt_identity()
-    watchlist = Watchlist.query.filter_by(
-        user_id=user_id, coin_id=coin_id).first()
-    if watchlist:
-        db.session.delete(watchlist)
-        db.session.commit()
+    if remove_from_watchlist(user_id, [coin_id]):
         return jsonify({'message': 'Coin  deleted successfully from watchlist'}), 200
+    return jsonify({'message': 'Coin not found in watchlist'}), 404
+
+
+@user_blueprint.route("/alerts", methods=["GET"])
+@jwt_required()
+@user_required
+def list_alerts():
+    """
+    List the user's price alerts, newest first.
+
+    Query Parameters:
+    - status (str, optional): "active" or "triggered".
+    """
+    user_id = get_jwt_identity()
+    query = PriceAlert.query.filter_by(user_id=user_id)
+    status = request.args.get("status")
+    if status == "active":
+        query = query.filter(PriceAlert.is_active.is_(True))
+    elif status == "triggered":
+        query = query.filter(PriceAlert.triggered_at.isnot(None))
+    elif status:
+        return jsonify({"message": "status must be one of: active, triggered"}), 400
+
+    alerts = query.order_by(PriceAlert.created_at.desc(), PriceAlert.id.desc()).all()
+    return jsonify(PriceAlertSchema(many=True).dump(alerts)), 200
+
+
+@user_blueprint.route("/alerts", methods=["POST"])
+@jwt_required()
+@user_required
+def create_alert():
+    """
+    Create a price alert.
+
+    Request Body (JSON):
+    - coin_id (int): The coin to watch.
+    - direction (str): "above" or "below".
+    - threshold (float): USD price that triggers the alert.
+    """
+    user_id = get_jwt_identity()
+    try:
+        data = PriceAlertSchema().load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    active = PriceAlert.query.filter_by(user_id=user_id, is_active=True).count()
+    if active >= current_app.config["PRICE_ALERTS_PER_USER"]:
+        return jsonify({"message": "Too many active price alerts"}), 400
+
+    alert = PriceAlert(user_id=user_id, **data)
+    try:
+        db.session.add(alert)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error while creating price alert: {e}")
+        return jsonify({"message": "Failed to create price alert"}), 500
+
+    price_alerts.add(alert)
+    return jsonify(PriceAlertSchema().dump(alert)), 201
+
+
+@user_blueprint.route("/alerts/<int:alert_id>", methods=["DELETE"])
+@jwt_required()
+@user_required
+def delete_alert(alert_id):
+    user_id = get_jwt_identity()
+    alert = PriceAlert.query.filter_by(id=alert_id, user_id=user_id).first()
+    if not alert:
+        return jsonify({"message": "Price alert not found"}), 404
+
+    db.session.delete(alert)
+    db.session.commit()
+    price_alerts.remove(alert)
+    return jsonify({"message": "Price alert deleted successfully"}), 200
@@ -0,0 +1,16 @@
+from marshmallow import Schema, fields, validate
+
+from src.utils.price_alerts import DIRECTIONS
+
+
+class PriceAlertSchema(Schema):
+    """Schema for creating and serializing price alerts."""
+
+    id = fields.Int(dump_only=True)
+    coin_id = fields.Int(required=True, error_messages={"required": "coin_id is required"})
+    direction = fields.Str(required=True, validate=validate.OneOf(DIRECTIONS))
+    threshold = fields.Float(required=True, validate=validate.Range(min=0, min_inclusive=False))
+    is_active = fields.Bool(dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+    triggered_at = fields.DateTime(dump_only=True)
+    triggered_price = fields.Float(dump_only=True)
@@ -0,0 +1,32 @@
+from urllib.parse import urlsplit
+
+from marshmallow import Schema, ValidationError, fields, validate
+
+
+def validate_sub_request_path(path):
+    """Only API paths, and never the batch endpoint itself."""
+    route = urlsplit(path).path.rstrip("/")
+    if not f"{route}/".startswith("/api/v1/"):
+        raise ValidationError("path must start with /api/v1/")
+    if route == "/api/v1/batch":
+        raise ValidationError("batches cannot be nested")
+
+
+class BatchSubRequestSchema(Schema):
+    """Schema for one request inside a batch."""
+
+    id = fields.Str(load_default=None)
+    method = fields.Str(load_default="GET", validate=validate.OneOf(["GET"]))
+    path = fields.Str(required=True, validate=validate_sub_request_path,
+                      error_messages={"required": "path is required"})
+
+
+class BatchSchema(Schema):
+    """Schema for a batch of read-only API requests."""
+
+    requests = fields.List(
+        fields.Nested(BatchSubRequestSchema),
+        required=True,
+        validate=validate.Length(min=1),
+        error_messages={"required": "requests is required"},
+    )
@@ -1,5 +1,17 @@
-from marshmallow import Schema, fields, validate, pre_load
-import bleach  # For HTML sanitization
+from marshmallow import Schema, fields, validate, pre_load, post_load
+import html
+
+EXCERPT_LENGTH = 280
+
+
+def make_excerpt(description, length=EXCERPT_LENGTH):
+    """Return a plain-text teaser of an HTML description, cut at a word boundary."""
+    import bleach  # Imported on first use to keep worker startup fast
+
+    text = " ".join(html.unescape(bleach.clean(description, tags=[], strip=True)).split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "…"
 
 
 class TipSchema(Schema):
@@ -19,6 +31,14 @@ class TipSchema(Schema):
     def sanitize_description(self, data, **kwargs):
         """Sanitize the description to remove unwanted HTML tags."""
         if "description" in data:
+            import bleach  # For HTML sanitization
             allowed_tags = ["p", "br", "b", "i", "u", "strong", "em", "ul", "ol", "li", "a"]
             data["description"] = bleach.clean(data["description"], tags=allowed_tags, strip=True)
         return data
+
+    @post_load
+    def derive_excerpt(self, data, **kwargs):
+        """Precompute the listing excerpt whenever the description is written."""
+        if "description" in data:
+            data["excerpt"] = make_excerpt(data["description"])
+        return data
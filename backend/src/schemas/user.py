@@ -30,3 +30,11 @@ class UserCreateSchema(UserSchema):
             ),
         ),
     )
+
+
+class UserProvisionSchema(UserCreateSchema):
+    """Schema for one record of an admin bulk-provisioning upload."""
+    role = fields.String(load_default="user", validate=validate.OneOf(["user", "admin"]))
+
+    def validate_email(self, data, **kwargs):
+        """Uniqueness is checked once per chunk with a set-based query instead."""
@@ -1,6 +1,6 @@
 from marshmallow import Schema, fields, ValidationError
 from src.models.users import User
-from src import pwd_context
+from src import db, password_hasher
 
 
 class UserLoginSchema(Schema):
@@ -20,11 +20,21 @@ class UserLoginSchema(Schema):
         """
         Validates email and password against stored user data.
 
+        A stored hash that is weaker than the current configuration is
+        transparently replaced with a fresh one.
+
         :param data: Dictionary containing login credentials
         :return: The authenticated user instance
         :raises ValidationError: If email or password is invalid
+        :raises PasswordHasherBusy: If the hashing queue is full
         """
         user = User.query.filter_by(email=data.get("email")).first()
-        if not user or not pwd_context.verify(data.get("password"), user.password):
+        if not user:
+            raise ValidationError("Invalid email or password.")
+        valid, new_hash = password_hasher.verify_and_update(data.get("password"), user.password)
+        if not valid:
             raise ValidationError("Invalid email or password.")
+        if new_hash:
+            user._password = new_hash
+            db.session.commit()
         return user
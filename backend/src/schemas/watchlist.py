@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 
 
 class WatchlistSchema(Schema):
@@ -6,3 +6,14 @@ class WatchlistSchema(Schema):
 
     coin_id = fields.Int(required=True, error_messages={"required": "coin_id is required"})
     user_id = fields.Int(required=True, error_messages={"required": "user_id is required"})
+
+
+class WatchlistBulkSchema(Schema):
+    """Schema for adding or removing several coins at once."""
+
+    coin_ids = fields.List(
+        fields.Int(),
+        required=True,
+        validate=validate.Length(min=1, max=500),
+        error_messages={"required": "coin_ids is required"},
+    )
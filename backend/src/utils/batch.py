@@ -0,0 +1,134 @@
+"""
+This module runs the sub-requests of a `/api/v1/batch` request.
+
+The frontend loads a page with several GETs (`/auth/me`, `/api/v1/`,
+`/user/watchlist`, `/api/v1/tips`...). A batch carries them in one HTTP
+round trip. The batch request authenticates once: its JWT is decoded and
+checked against the blocklist, and its user loaded, a single time. Each
+sub-request is then dispatched through the app like a normal request, with
+the caller's credentials, but:
+- the blocklist check is skipped for the already verified token;
+- the loaded user is merged into the sub-request's session, not queried
+  again.
+
+Sub-requests run concurrently on a pool of BATCH_WORKERS threads, so
+independent upstream calls (CoinMarketCap quotes for the watchlist, the
+market listing...) overlap. Each sub-request gets its own application
+context: its own `g`, database session and request hooks (metrics, replica
+routing), exactly as if it had been sent on its own. A sub-request still
+running BATCH_TIMEOUT seconds after the batch started is reported as a 504,
+so one slow upstream call cannot hold the whole batch.
+
+Classes:
+- BatchIdentity: The token id and user verified by the batch request.
+- BatchDispatcher: Flask extension dispatching sub-requests on a thread pool.
+
+Functions:
+- batch_identity(jwt_payload): The batch identity shared with a sub-request.
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from flask import g, request
+from werkzeug.test import EnvironBuilder
+
+logger = logging.getLogger(__name__)
+
+# Request headers a sub-request inherits from the batch request. Not Accept:
+# the batch response is JSON, so sub-requests must answer in JSON too
+FORWARDED_HEADERS = ("Authorization", "Cookie", "Accept-Language", "User-Agent", "X-Forwarded-For")
+TIMED_OUT = (504, True, json.dumps({"error": "Sub-request timed out"}).encode())
+
+
+class BatchIdentity(NamedTuple):
+    """The access token id and user verified once by a batch request."""
+    jti: str
+    user: object
+
+
+def batch_identity(jwt_payload):
+    """
+    Return the identity the enclosing batch request verified for this token.
+
+    :param jwt_payload: The decoded JWT of the current (sub-)request
+    :return: A BatchIdentity, or None outside a batch or for another token
+    """
+    identity = g.get("_batch_identity")
+    if identity is not None and identity.jti == jwt_payload.get("jti"):
+        return identity
+    return None
+
+
+class BatchDispatcher:
+    """
+    Dispatch batch sub-requests through the app.
+
+    Configuration keys:
+    - BATCH_MAX_REQUESTS: sub-requests allowed in one batch.
+    - BATCH_WORKERS: threads running sub-requests; 0 runs them one after the
+      other in the batch request's thread, without a timeout.
+    - BATCH_TIMEOUT: seconds after the batch started past which a pending
+      sub-request is answered with a 504.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        workers = app.config.get("BATCH_WORKERS", 4)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") if workers else None
+        app.extensions["batch_dispatcher"] = self
+
+    def dispatch(self, sub_requests, identity):
+        """
+        Run sub-requests with the current request's credentials.
+
+        :param sub_requests: List of dicts with `path` (and query string)
+        :param identity: BatchIdentity verified by the batch request, or None
+        :return: List of (status code, is JSON, body bytes), in input order
+        """
+        headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+        environs = [
+            EnvironBuilder(path=urlsplit(sub["path"]).path, query_string=urlsplit(sub["path"]).query,
+                           method="GET", headers=headers, base_url=request.host_url,
+                           environ_base={"REMOTE_ADDR": request.remote_addr}).get_environ()
+            for sub in sub_requests
+        ]
+        if self._executor is None:
+            return [self._run(environ, identity) for environ in environs]
+        deadline = time.monotonic() + self.app.config.get("BATCH_TIMEOUT", 10)
+        futures = [self._executor.submit(self._run, environ, identity) for environ in environs]
+        results = []
+        for environ, future in zip(environs, futures):
+            try:
+                results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                future.cancel()  # Only succeeds if it has not started yet
+                logger.warning(f"Batch sub-request {environ['PATH_INFO']} timed out")
+                results.append(TIMED_OUT)
+        return results
+
+    def _run(self, environ, identity):
+        app = self.app
+        # A fresh app context: the sub-request must not share `g` or the session with the batch
+        with app.app_context(), app.request_context(environ):
+            g._batch_identity = identity
+            try:
+                response = app.full_dispatch_request()
+                body = response.get_data()
+                response.close()
+                return response.status_code, response.is_json, body
+            except Exception:
+                logger.exception(f"Batch sub-request {environ['PATH_INFO']} failed")
+                return 500, True, json.dumps({"error": "Internal server error"}).encode()
@@ -0,0 +1,59 @@
+"""
+This module keeps the version tokens of versioned caches in the database.
+
+A cache keyed by a version token is invalidated by writing a new token.
+The tokens live in the `cache_versions` table, not in Flask-Caching, so a
+bump made by one worker is seen by every other worker on its next read,
+even with the per-process `SimpleCache`: the cached entries may be per
+process, but which of them are current is shared. Reading a token is one
+primary-key lookup, always on the primary database.
+
+Functions:
+- get_version(name): The current token of a cache.
+- bump_version(name): Replace the token of a cache and commit.
+"""
+
+import uuid
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from src import db
+from src.models import CacheVersion
+from src.utils.db_replicas import primary_reads
+
+# Token of a cache that was never bumped
+INITIAL_VERSION = "0"
+
+
+def get_version(name):
+    """
+    Return the current version token of a cache. Never writes, so it is safe
+    in GET handlers.
+
+    :param name: Cache name, e.g. "tips"
+    :return: The token string
+    """
+    with primary_reads():
+        version = db.session.scalar(select(CacheVersion.version).where(CacheVersion.name == name))
+    return version or INITIAL_VERSION
+
+
+def bump_version(name):
+    """
+    Give a cache a new version token and commit it. Call after committing the
+    write it invalidates, so no worker caches the old data under the new token.
+
+    :param name: Cache name, e.g. "tips"
+    :return: The new token
+    """
+    version = uuid.uuid4().hex
+    statement = update(CacheVersion).where(CacheVersion.name == name).values(version=version)
+    if not db.session.execute(statement).rowcount:
+        try:
+            db.session.execute(insert(CacheVersion).values(name=name, version=version))
+        except IntegrityError:  # Another worker created it first
+            db.session.rollback()
+            db.session.execute(statement)
+    db.session.commit()
+    return version
@@ -0,0 +1,127 @@
+"""
+This module tunes the SQLAlchemy engines for the database in use.
+
+SQLite (the Docker default) gets pragmas on every new connection:
+- WAL journaling, so readers no longer block behind a writer;
+- synchronous=NORMAL, which is durable in WAL mode except for the last
+  transactions on power loss;
+- a busy timeout, so a writer waits for the lock instead of failing;
+- memory-mapped reads and a larger page cache.
+
+PostgreSQL gets a connection pool sized for the gunicorn worker model. Each
+worker process has its own pool:
+- sync: one request at a time per worker;
+- gthread: up to WORKER_THREADS requests at once;
+- gevent: many greenlets, capped at DB_POOL_MAX_CONCURRENCY;
+- plus the background threads that use the database (image processing,
+  batch sub-requests).
+Connections are pre-pinged and recycled so that failovers and server-side
+idle timeouts never surface as request errors.
+
+Explicit values in SQLALCHEMY_ENGINE_OPTIONS or DB_POOL_SIZE /
+DB_MAX_OVERFLOW always win over the computed profile.
+
+Functions:
+- pool_sizing(config): Pool size and overflow for the worker model.
+- engine_options(config): SQLALCHEMY_ENGINE_OPTIONS for the configured URI.
+- apply_sqlite_pragmas(dbapi_connection, pragmas): Run pragmas on a connection.
+- install_sqlite_pragmas(engine, pragmas): Run pragmas on an engine's new connections.
+- configure_engines(app, db): Install the profile on an app's engines.
+"""
+
+import sqlite3
+
+
+def pool_sizing(config):
+    """
+    Compute the pool size and overflow for one worker process.
+
+    :param config: The app config mapping
+    :return: Tuple of (pool_size, max_overflow)
+    """
+    worker_class = config.get("WORKER_CLASS", "sync")
+    if worker_class == "gthread":
+        concurrency = config.get("WORKER_THREADS", 1)
+    elif worker_class == "gevent":
+        concurrency = config.get("DB_POOL_MAX_CONCURRENCY", 10)
+    else:
+        concurrency = 1
+    background = (config.get("IMAGE_PROCESSING_WORKERS", 0) or 0) + (config.get("BATCH_WORKERS", 0) or 0)
+
+    pool_size = config.get("DB_POOL_SIZE") or concurrency + background
+    max_overflow = config.get("DB_MAX_OVERFLOW")
+    if max_overflow is None:
+        max_overflow = max(2, pool_size // 2)
+    return int(pool_size), int(max_overflow)
+
+
+def engine_options(config):
+    """
+    Build the engine options for the configured database.
+
+    :param config: The app config mapping
+    :return: Dict for SQLALCHEMY_ENGINE_OPTIONS
+    """
+    options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    uri = str(config.get("SQLALCHEMY_DATABASE_URI") or "")
+    if uri.startswith(("postgresql", "postgres")):
+        pool_size, max_overflow = pool_sizing(config)
+        options.setdefault("pool_size", pool_size)
+        options.setdefault("max_overflow", max_overflow)
+        options.setdefault("pool_timeout", config.get("DB_POOL_TIMEOUT", 10))
+        options.setdefault("pool_pre_ping", config.get("DB_POOL_PRE_PING", True))
+        options.setdefault("pool_recycle", config.get("DB_POOL_RECYCLE", 1800))
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """
+    Run PRAGMA statements on a new SQLite connection.
+
+    :param dbapi_connection: The sqlite3 connection
+    :param pragmas: Dict of pragma name to value, applied in order
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """
+    Run the pragmas on every new connection of a SQLite engine. Other
+    dialects are left alone.
+
+    :param engine: The SQLAlchemy engine
+    :param pragmas: Dict of pragma name to value
+    """
+    from sqlalchemy import event
+
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    def on_connect(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    event.listen(engine, "connect", on_connect)
+    # Connections opened before the listener existed are replaced
+    engine.dispose()
+
+
+def configure_engines(app, db):
+    """
+    Install the SQLite pragmas on the app's engines. Call after `db.init_app`.
+
+    :param app: The Flask app
+    :param db: The Flask-SQLAlchemy extension
+    """
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    if not pragmas:
+        return
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        install_sqlite_pragmas(engine, pragmas)
@@ -0,0 +1,229 @@
+"""
+This module sends the reads of safe requests to database read replicas.
+
+With SQLALCHEMY_REPLICA_URIS set, each GET/HEAD/OPTIONS request picks one
+healthy replica, round-robin, and its SELECT statements run there. Anything
+else stays on the primary:
+- other statements (INSERT/UPDATE/DELETE and raw `text()` SQL), so the
+  occasional write in a GET handler, such as marking price alerts as
+  triggered, still works;
+- every statement after the session's first write in the request;
+- requests with any other method.
+
+Health is checked lazily, at most every REPLICA_HEALTH_INTERVAL seconds
+per replica, from `before_request`; replica connections give up after
+REPLICA_CONNECT_TIMEOUT seconds so a dead host cannot hang requests. A replica that cannot answer `SELECT 1` is skipped until its
+next check. On PostgreSQL, so is one that is more than REPLICA_MAX_LAG
+seconds behind the primary. With no healthy replica, reads fall back to
+the primary.
+
+Read-your-writes: after a successful mutating request, the caller is
+pinned to the primary for REPLICA_STICKY_SECONDS. Authenticated callers
+are pinned by JWT identity in the Flask-Caching backend; the pin only
+holds across devices and workers when that backend is shared (e.g. Redis).
+With the default per-process `SimpleCache` it holds in the worker that
+served the write, and a warning is logged at startup. Every caller also
+gets a short-lived cookie, which covers requests made before login, such
+as registering. Views that only read despite their method (the GET batch)
+set `g.db_read_only` to skip the pin.
+
+Caches keyed by a version token (tips, price alerts) must be filled from
+the primary: a replica that has not replayed the write behind a new
+version would store stale data under it. `primary_reads()` does that.
+
+Classes:
+- RoutingSession: Flask-SQLAlchemy session that routes reads to a replica.
+- ReplicaRouter: Flask extension that owns the replica engines and picks
+  one per request.
+
+Functions:
+- primary_reads(): Context manager running the block's reads on the primary.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+PIN_COOKIE = "db_primary_pin"
+# 0 when the replica has replayed everything it received, else the replay lag
+PG_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that runs SELECTs on the replica chosen for the current request.
+
+    Pass it as `session_options={"class_": RoutingSession}` to SQLAlchemy.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            replica = g.get("_db_replica")
+            if replica is not None and not self.info.get("wrote"):
+                if isinstance(clause, Select) and not self._flushing:
+                    return replica
+                if clause is not None or self._flushing:
+                    # First write of the request: read our own writes from now on
+                    self.info["wrote"] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Run the reads of the block on the primary, whatever the request's replica.
+    """
+    replica = g.pop("_db_replica", None) if has_app_context() else None
+    try:
+        yield
+    finally:
+        if replica is not None:
+            g._db_replica = replica
+
+
+class _Replica:
+    """A replica engine and its last health check result."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """
+    Pick a read replica per request and pin writers to the primary.
+
+    Configuration keys:
+    - SQLALCHEMY_REPLICA_URIS: list of replica database URIs; empty disables
+      routing.
+    - REPLICA_HEALTH_INTERVAL: seconds between health checks of a replica.
+    - REPLICA_CONNECT_TIMEOUT: seconds to wait when connecting to a replica
+      (not SQLite).
+    - REPLICA_MAX_LAG: replication lag in seconds above which a PostgreSQL
+      replica is skipped.
+    - REPLICA_STICKY_SECONDS: how long a writer reads from the primary.
+    """
+
+    def __init__(self, cache, app=None):
+        self.cache = cache
+        self.replicas = []
+        self._counter = itertools.count()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from src.utils.db_engine import engine_options, install_sqlite_pragmas
+
+        app.extensions["replica_router"] = self
+        uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+        if not uris:
+            return
+        if app.config.get("CACHE_TYPE") in ("SimpleCache", "simple", "NullCache", "null"):
+            logger.warning("Read replicas are configured with a per-process cache: writers are only "
+                           "pinned to the primary by the worker that served their write")
+        for uri in uris:
+            options = engine_options({**app.config, "SQLALCHEMY_DATABASE_URI": uri})
+            if not uri.startswith("sqlite"):
+                # Health checks connect inside before_request: fail fast on a dead replica
+                options["connect_args"] = {"connect_timeout": app.config.get("REPLICA_CONNECT_TIMEOUT", 2),
+                                           **(options.get("connect_args") or {})}
+            engine = create_engine(uri, **options)
+            install_sqlite_pragmas(engine, app.config.get("SQLITE_PRAGMAS") or {})
+            self.replicas.append(_Replica(engine))
+        app.before_request(self._choose_bind)
+        app.after_request(self._pin_writer)
+
+    def pick(self):
+        """
+        Return the next healthy replica engine, round-robin.
+
+        :return: An Engine, or None if no replica is healthy
+        """
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._counter) % len(self.replicas)]
+            if self._is_healthy(replica):
+                return replica.engine
+        return None
+
+    def _is_healthy(self, replica):
+        interval = current_app.config.get("REPLICA_HEALTH_INTERVAL", 10)
+        now = time.monotonic()
+        if replica.checked_at is not None and now - replica.checked_at < interval:
+            return replica.healthy
+        if not replica.lock.acquire(blocking=False):
+            return replica.healthy  # Another thread is checking it
+        try:
+            healthy = self._check(replica.engine)
+            if healthy != replica.healthy:
+                log = logger.info if healthy else logger.warning
+                log(f"Read replica {replica.engine.url!r} is now {'healthy' if healthy else 'unhealthy'}")
+            replica.healthy, replica.checked_at = healthy, time.monotonic()
+        finally:
+            replica.lock.release()
+        return replica.healthy
+
+    @staticmethod
+    def _check(engine):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                if engine.dialect.name != "postgresql":
+                    return True
+                lag = conn.execute(PG_LAG_QUERY).scalar()
+        except SQLAlchemyError as e:
+            logger.warning(f"Read replica {engine.url!r} failed its health check: {e}")
+            return False
+        return lag is None or lag <= current_app.config.get("REPLICA_MAX_LAG", 5)
+
+    @staticmethod
+    def _identity():
+        """The JWT identity of the caller, if the request carries a valid token."""
+        from flask_jwt_extended import decode_token
+
+        token = None
+        header = request.headers.get("Authorization", "")
+        if header.startswith("Bearer "):
+            token = header[7:]
+        else:
+            token = request.cookies.get(current_app.config["JWT_ACCESS_COOKIE_NAME"])
+        if not token:
+            return None
+        try:
+            return decode_token(token).get(current_app.config["JWT_IDENTITY_CLAIM"])
+        except Exception:  # Invalid or expired: the route itself will reject it
+            return None
+
+    def _choose_bind(self):
+        if request.method not in SAFE_METHODS or request.cookies.get(PIN_COOKIE):
+            return
+        identity = self._identity()
+        if identity is not None and self.cache.get(f"db_pin_{identity}"):
+            return
+        g._db_replica = self.pick()
+
+    def _pin_writer(self, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400 or g.get("db_read_only"):
+            return response
+        sticky = current_app.config.get("REPLICA_STICKY_SECONDS", 5)
+        identity = self._identity()
+        if identity is not None:
+            self.cache.set(f"db_pin_{identity}", 1, timeout=sticky)
+        response.set_cookie(PIN_COOKIE, "1", max_age=sticky, httponly=True,
+                            samesite="Lax", secure=current_app.config.get("JWT_COOKIE_SECURE", False))
+        return response
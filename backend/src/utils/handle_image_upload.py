@@ -1,43 +1,70 @@
+import hashlib
 import os
-import uuid
-from PIL import Image
+import tempfile
 from werkzeug.utils import secure_filename
 from flask import current_app, url_for
 
+CHUNK_SIZE = 64 * 1024
 
-def resize_image(file_path, max_size=(1024, 1024)):
-    with Image.open(file_path) as img:
-        img.thumbnail(max_size)
-        img.save(file_path)
 
-
-def generate_filename(filename):
+def generate_filename(digest, filename):
     extension = filename.rsplit('.', 1)[1].lower()
-    return f"{uuid.uuid4().hex}.{extension}"
+    return f"{digest}.{extension}"
+
+
+def store_upload(image_file, upload_folder):
+    """
+    Stream an upload to disk under its content hash.
+
+    The file is hashed while it is copied to a temporary file, then renamed
+    into place. If the same content was uploaded before, the temporary copy is
+    dropped and the existing file is reused.
+
+    :param image_file: The uploaded FileStorage
+    :param upload_folder: Destination directory
+    :return: The stored filename
+    """
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in iter(lambda: image_file.stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                tmp.write(chunk)
+
+        filename = generate_filename(digest.hexdigest()[:32], secure_filename(image_file.filename))
+        file_path = os.path.join(upload_folder, filename)
+        if os.path.exists(file_path):
+            # Duplicate content: keep the stored copy, refresh its GC grace period
+            os.utime(file_path)
+        else:
+            os.replace(tmp_path, file_path)
+        return filename
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 def handle_image_upload(image_file):
-    """Handles image upload, resizing, and returns the image URL."""
+    """
+    Handles image upload and returns the image URL.
+
+    Files are content-addressed, so re-uploading an image reuses the stored
+    copy. Resizing happens afterwards on the image processor's worker pool;
+    see `ImageProcessor.submit`.
+    """
     try:
         if image_file.filename == '':
             return None, "No selected file"  # Return None and an error message
 
-        filename = secure_filename(image_file.filename)
-        filename = generate_filename(filename)
         upload_folder = current_app.config['UPLOAD_FOLDER']
 
         # Ensure the upload directory exists
         os.makedirs(upload_folder, exist_ok=True)
 
-        file_path = os.path.join(upload_folder, filename)
-
-        # Save the image before trying to resize
-        image_file.save(file_path)
-
-        # Now resize the image
-        resize_image(file_path)
+        filename = store_upload(image_file, upload_folder)
 
-        image_url = url_for("static", filename=f"uploads/{filename}", _external=True)
+        image_url = url_for("uploads.serve_upload", filename=filename, _external=True)
         return image_url, None  # Return the URL and None for no error
     except Exception as e:
         return None, str(e)  # Return None and the error message
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from flask import current_app
 from flask_jwt_extended import decode_token
+from sqlalchemy import select
 from sqlalchemy.orm.exc import NoResultFound
 
 from src import db
@@ -62,7 +63,9 @@ def is_token_revoked(jwt_payload):
     """
     jti = jwt_payload["jti"]
     try:
-        token = TokenBlocklist.query.filter_by(jti=jti).one()
+        # Always ask the primary: a lagging read replica would accept revoked tokens
+        token = db.session.scalars(select(TokenBlocklist).filter_by(jti=jti),
+                                   bind_arguments={"bind": db.engine}).one()
         return token.revoked_at is not None
     except NoResultFound:
         return True
@@ -0,0 +1,134 @@
+"""
+This module turns uploaded tip images into sized renditions on a background
+worker pool, so admin requests only pay for writing the upload to disk.
+
+Each image is decoded once (JPEGs in draft mode, letting libjpeg scale down
+while decoding), and every rendition is derived from the previous, larger one
+rather than from the original. Each size is also written as WebP. Renditions
+are new files, never overwrites, so every upload URL keeps its content and
+can be cached as immutable. Once done, the result is stored on
+`Tip.renditions` and `Tip.image` is pointed at the largest rendition.
+
+Classes:
+- ImageProcessor: Flask extension owning the worker pool.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def _save(img, path, fmt):
+    """Write `img` to `path` atomically so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    if fmt == "WEBP" and img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    img.save(tmp_path, format=fmt)
+    os.replace(tmp_path, path)
+
+
+def build_renditions(file_path, image_url, sizes):
+    """
+    Decode an uploaded image once and write every rendition next to it.
+
+    :param file_path: Path of the uploaded original
+    :param image_url: Public URL of the original
+    :param sizes: Mapping of rendition name to max edge in pixels
+    :return: Mapping of rendition name to {"width", "height", "url", "webp"}
+    """
+    from PIL import Image
+
+    folder, filename = os.path.split(file_path)
+    stem = filename.rsplit(".", 1)[0]
+    base_url = image_url.rsplit("/", 1)[0]
+    ordered = sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+    renditions = {}
+
+    with Image.open(file_path) as img:
+        fmt = img.format
+        if fmt == "JPEG":
+            largest = ordered[0][1]
+            img.draft("RGB", (largest, largest))
+        current = img.copy()
+
+    extension = filename.rsplit(".", 1)[1]
+    for name, edge in ordered:
+        current.thumbnail((edge, edge))
+        rendition = f"{stem}_{name}.{extension}"
+        webp = f"{stem}_{name}.webp"
+        _save(current, os.path.join(folder, rendition), fmt)
+        _save(current, os.path.join(folder, webp), "WEBP")
+        renditions[name] = {
+            "width": current.width,
+            "height": current.height,
+            "url": f"{base_url}/{rendition}",
+            "webp": f"{base_url}/{webp}",
+        }
+    return renditions
+
+
+class ImageProcessor:
+    """
+    Run `build_renditions` on a thread pool and record the results.
+
+    Configuration keys:
+    - IMAGE_RENDITIONS: mapping of rendition name to max edge in pixels.
+    - IMAGE_PROCESSING_WORKERS: pool size; 0 processes inline, which keeps
+      tests deterministic.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        workers = app.config.get("IMAGE_PROCESSING_WORKERS", 2)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="img") if workers else None
+        app.extensions["image_processor"] = self
+
+    def submit(self, tip_id, image_url):
+        """
+        Queue rendition generation for a tip's freshly uploaded image.
+
+        :param tip_id: The tip the image belongs to
+        :param image_url: URL returned by `handle_image_upload`
+        """
+        if self._executor is None:
+            self._process(tip_id, image_url)
+        else:
+            self._executor.submit(self._process, tip_id, image_url)
+
+    def _process(self, tip_id, image_url):
+        from sqlalchemy import update
+        from src import db
+        from src.models import Tip
+        from src.utils.tip_cache import bump_tips_version
+
+        with self.app.app_context():
+            file_path = os.path.join(self.app.config["UPLOAD_FOLDER"], image_url.rsplit("/", 1)[1])
+            try:
+                # Content-addressed uploads: reuse renditions of an identical image
+                stem = image_url.rsplit("/", 1)[1].split(".", 1)[0]
+                renditions = db.session.query(Tip.renditions).filter(
+                    Tip.image.like(f"%/{stem}%"), Tip.renditions.isnot(None)).limit(1).scalar()
+                if renditions is None:
+                    renditions = build_renditions(file_path, image_url, self.app.config["IMAGE_RENDITIONS"])
+                largest = max(renditions.values(), key=lambda rendition: rendition["width"])
+                # Skip the write if the tip's image was replaced in the meantime
+                db.session.execute(
+                    update(Tip)
+                    .where(Tip.id == tip_id, Tip.image == image_url)
+                    .values(image=largest["url"], renditions=renditions, updated_at=Tip.updated_at)
+                )
+                db.session.commit()
+                bump_tips_version()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Image processing failed for tip {tip_id} ({image_url}): {e}")
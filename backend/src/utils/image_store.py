@@ -0,0 +1,92 @@
+"""
+This module reclaims uploaded images that no tip references any more.
+
+Uploads are content-addressed (see `handle_image_upload`), so one stored
+image may back several tips. A file is only deleted once its reference count,
+the number of tips whose `image` points at it, drops to zero. Each stored
+image owns a family of files sharing its stem: the original plus the sized
+and WebP renditions written by `ImageProcessor`.
+
+Files touched within UPLOAD_GC_GRACE_SECONDS are never deleted, which covers
+uploads whose tip has not been committed yet. A tip may point at the
+original or at any rendition, so references are counted per stem.
+
+Functions:
+- release_image(image_url): Delete an image's files if it is unreferenced.
+- collect_orphans(dry_run): Sweep the upload folder for unreferenced files.
+"""
+
+import logging
+import os
+import time
+
+from flask import current_app
+
+from src import db
+from src.models import Tip
+
+logger = logging.getLogger(__name__)
+
+
+def _stem(filename):
+    """Return the content hash shared by an image and its renditions."""
+    return filename.split(".", 1)[0].split("_", 1)[0]
+
+
+def _reference_count(stem):
+    return Tip.query.filter(Tip.image.like(f"%/{stem}%")).count()
+
+
+def _is_recent(path, now):
+    return now - os.path.getmtime(path) < current_app.config["UPLOAD_GC_GRACE_SECONDS"]
+
+
+def release_image(image_url):
+    """
+    Drop a reference to an image, deleting its files if none remain.
+
+    Call after the commit that removed or replaced the reference.
+
+    :param image_url: URL of the image that is no longer used
+    :return: Number of files removed
+    """
+    if not image_url:
+        return 0
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    stem = _stem(image_url.rsplit("/", 1)[-1])
+    family = [os.path.join(upload_folder, name) for name in os.listdir(upload_folder) if _stem(name) == stem]
+    now = time.time()
+    if not family or any(_is_recent(path, now) for path in family) or _reference_count(stem):
+        return 0
+
+    for path in family:
+        os.remove(path)
+    return len(family)
+
+
+def collect_orphans(dry_run=False):
+    """
+    Delete every upload whose stem no tip references.
+
+    :param dry_run: Only report what would be deleted
+    :return: Dict with the removed file names and the bytes reclaimed
+    """
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    referenced = {
+        _stem(image.rsplit("/", 1)[-1])
+        for (image,) in db.session.query(Tip.image).filter(Tip.image.isnot(None)).distinct()
+    }
+
+    now = time.time()
+    removed, reclaimed = [], 0
+    for name in sorted(os.listdir(upload_folder)):
+        path = os.path.join(upload_folder, name)
+        if not os.path.isfile(path) or _stem(name) in referenced or _is_recent(path, now):
+            continue
+        reclaimed += os.path.getsize(path)
+        removed.append(name)
+        if not dry_run:
+            os.remove(path)
+    if removed and not dry_run:
+        logger.info(f"Removed {len(removed)} orphaned uploads ({reclaimed} bytes)")
+    return {"removed": removed, "bytes": reclaimed}
@@ -0,0 +1,154 @@
+"""
+This module implements the login throttle that protects the password hasher
+from credential-stuffing bursts.
+
+Attempts are counted per client IP and per email address with a sliding
+window approximated by two fixed buckets (current and previous), so each key
+costs O(1) memory. Behind a reverse proxy the client IP is only right with
+PROXY_COUNT set (see `create_app`); otherwise every client shares the
+proxy's bucket. Email addresses are logged hashed, never in clear. Counters live in two tiers:
+
+- an in-process LRU, which rejects hot keys without any network round trip and
+  keeps working if the shared store is unavailable;
+- the Flask-Caching backend, which makes limits hold across gunicorn workers
+  when a shared cache (e.g. Redis) is configured.
+
+Classes:
+- SlidingWindowCounter: Bounded in-process sliding-window counter.
+- LoginThrottle: Flask extension combining both tiers with metrics.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowCounter:
+    """
+    In-process sliding-window counter with LRU eviction.
+
+    Each key stores `[bucket, current_count, previous_count]`; the estimate
+    weights the previous bucket by how much of it still overlaps the window.
+    """
+
+    def __init__(self, window, max_keys):
+        self.window = window
+        self.max_keys = max_keys
+        self.evictions = 0
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._counters)
+
+    def hit(self, key, now):
+        """
+        Record one attempt for `key` and return the sliding-window estimate.
+        """
+        bucket, offset = divmod(now, self.window)
+        with self._lock:
+            entry = self._counters.pop(key, None)
+            if entry is None or entry[0] < bucket - 1:
+                entry = [bucket, 0, 0]
+            elif entry[0] == bucket - 1:
+                entry = [bucket, 0, entry[1]]
+            entry[1] += 1
+            self._counters[key] = entry
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+                self.evictions += 1
+        return entry[1] + entry[2] * (1 - offset / self.window)
+
+
+class LoginThrottle:
+    """
+    Reject login attempts over the configured per-IP and per-email limits.
+
+    Configuration keys:
+    - LOGIN_THROTTLE_ENABLED: turn the throttle on or off.
+    - LOGIN_THROTTLE_WINDOW: window length in seconds.
+    - LOGIN_THROTTLE_IP_LIMIT: attempts allowed per IP and window.
+    - LOGIN_THROTTLE_EMAIL_LIMIT: attempts allowed per email and window.
+    - LOGIN_THROTTLE_MAX_KEYS: in-process keys kept before LRU eviction.
+    """
+
+    def __init__(self, cache, app=None):
+        self.cache = cache
+        self.enabled = True
+        self.window = 60
+        self.limits = {}
+        self._local = SlidingWindowCounter(self.window, 10000)
+        self._metrics = {"allowed": 0, "throttled_ip": 0, "throttled_email": 0, "shared_store_errors": 0}
+        self._metrics_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("LOGIN_THROTTLE_ENABLED", True)
+        self.window = app.config.get("LOGIN_THROTTLE_WINDOW", 60)
+        self.limits = {
+            "ip": app.config.get("LOGIN_THROTTLE_IP_LIMIT", 20),
+            "email": app.config.get("LOGIN_THROTTLE_EMAIL_LIMIT", 5),
+        }
+        self._local = SlidingWindowCounter(self.window, app.config.get("LOGIN_THROTTLE_MAX_KEYS", 10000))
+        app.extensions["login_throttle"] = self
+
+    def check(self, ip, email):
+        """
+        Count one login attempt and decide whether it may proceed.
+
+        :param ip: The client address
+        :param email: The email address being logged into
+        :return: Seconds the client should wait, or 0 if the attempt is allowed
+        """
+        if not self.enabled:
+            return 0
+
+        now = time.time()
+        for scope, value in (("ip", ip), ("email", (email or "").strip().lower())):
+            if not value:
+                continue
+            key = f"{scope}:{value}"
+            estimate = self._local.hit(key, now)
+            if estimate <= self.limits[scope]:
+                estimate = max(estimate, self._shared_hit(key, now))
+            if estimate > self.limits[scope]:
+                self._count(f"throttled_{scope}")
+                shown = hashlib.sha256(value.encode()).hexdigest()[:12] if scope == "email" else value
+                logger.warning(f"Login throttled: {scope}={shown}")
+                return int(self.window - now % self.window) + 1
+
+        self._count("allowed")
+        return 0
+
+    def metrics(self):
+        """Return a snapshot of the throttle counters."""
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        snapshot["tracked_keys"] = len(self._local)
+        snapshot["evicted_keys"] = self._local.evictions
+        return snapshot
+
+    def _shared_hit(self, key, now):
+        bucket, offset = divmod(int(now), self.window)
+        current_key = f"login_throttle:{key}:{bucket}"
+        try:
+            # `add` sets the expiry once; `inc` keeps it on atomic backends.
+            # Flask-Caching does not proxy `inc`, so use the cachelib backend.
+            store = self.cache.cache
+            store.add(current_key, 0, timeout=self.window * 2)
+            current = store.inc(current_key) or 0
+            previous = store.get(f"login_throttle:{key}:{bucket - 1}") or 0
+        except Exception as e:
+            self._count("shared_store_errors")
+            logger.error(f"Login throttle store unavailable: {e}")
+            return 0
+        return current + previous * (1 - offset / self.window)
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self._metrics[name] += 1
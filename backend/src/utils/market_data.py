@@ -0,0 +1,106 @@
+"""
+This module serves CoinMarketCap quotes for individual coins.
+
+Quotes are cached per coin, so watchlists that share coins share the cached
+quotes. When a request misses the cache, the upstream call is topped up to
+QUOTE_PREFETCH_SIZE ids with the most watched coins that are not cached
+yet. CoinMarketCap bills quotes per block of 100 ids, so the popular coins
+are refreshed first, and nearly for free, ahead of the users who will ask
+for them next. Every fetched batch is also checked against price alerts.
+
+Functions:
+- cmc_get(path, params): Call the CoinMarketCap API, recording its latency.
+- fetch_quotes(coin_ids): Fetch quotes from CoinMarketCap.
+- get_quotes(coin_ids): Quotes for the given coins, from the cache when fresh.
+"""
+
+import logging
+import os
+import time
+
+import requests
+from flask import current_app
+
+from src import cache, price_alerts, metrics
+from src.utils.watch_counts import most_watched
+
+logger = logging.getLogger(__name__)
+
+COIN_API_KEY = os.getenv('COIN_API_KEY')
+COIN_API_BASE_URL = "https://pro-api.coinmarketcap.com"
+
+
+def cmc_get(path, params=None):
+    """
+    GET a CoinMarketCap API path and record the call in the upstream latency
+    histogram.
+
+    :param path: API path, e.g. "/v1/cryptocurrency/listings/latest"
+    :param params: Query parameters
+    :return: The `requests` response
+    :raises requests.exceptions.RequestException: On connection errors and
+        after COINMARKETCAP_TIMEOUT seconds without an answer
+    """
+    headers = {'Accepts': 'application/json',
+               "X-CMC_PRO_API_KEY": COIN_API_KEY}
+    start = time.perf_counter()
+    status = "error"
+    try:
+        response = requests.get(f"{COIN_API_BASE_URL}{path}", headers=headers, params=params,
+                                timeout=current_app.config.get("COINMARKETCAP_TIMEOUT", 10))
+        status = response.status_code
+        return response
+    finally:
+        metrics.observe_upstream("coinmarketcap", path, time.perf_counter() - start, status)
+
+
+def fetch_quotes(coin_ids):
+    """
+    Fetch the latest quotes for the given coin IDs from CoinMarketCap.
+
+    :param coin_ids: Iterable of coin IDs
+    :return: The `data` mapping of the API response, or None on failure
+    """
+    try:
+        parameters = {'id': ",".join(str(coin_id) for coin_id in coin_ids), 'skip_invalid': 'true'}
+        response = cmc_get("/v1/cryptocurrency/quotes/latest", params=parameters)
+        response.raise_for_status()  # Raise an exception for HTTP errors
+        return response.json().get("data", {})
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to fetch data from CoinMarketCap API: {e}")
+        return None
+
+
+def get_quotes(coin_ids):
+    """
+    Return quotes for the given coins, fetching only the ones not cached.
+
+    :param coin_ids: List of coin IDs
+    :return: Dict of coin ID to CoinMarketCap item (coins unknown upstream are
+        left out), or None if the upstream call failed
+    """
+    keys = [f"quote_{coin_id}" for coin_id in coin_ids]
+    quotes = {coin_id: quote for coin_id, quote in zip(coin_ids, cache.get_many(*keys)) if quote is not None}
+    missing = [coin_id for coin_id in dict.fromkeys(coin_ids) if coin_id not in quotes]
+    if not missing:
+        return quotes
+
+    batch_size = current_app.config["QUOTE_PREFETCH_SIZE"]
+    batch = list(missing)
+    if len(batch) < batch_size:
+        popular = [coin["coin_id"] for coin in most_watched(batch_size)]
+        wanted = set(missing)
+        candidates = [coin_id for coin_id in popular if coin_id not in wanted]
+        cached = cache.get_many(*(f"quote_{coin_id}" for coin_id in candidates)) if candidates else []
+        batch += [coin_id for coin_id, quote in zip(candidates, cached) if quote is None][:batch_size - len(batch)]
+
+    data = fetch_quotes(batch)
+    if data is None:
+        return None
+
+    fetched = {item["id"]: item for item in data.values()}
+    cache.set_many({f"quote_{coin_id}": item for coin_id, item in fetched.items()},
+                   timeout=current_app.config["QUOTE_CACHE_TIMEOUT"])
+    price_alerts.evaluate(fetched)
+    quotes.update((coin_id, fetched[coin_id]) for coin_id in missing if coin_id in fetched)
+    return quotes
@@ -0,0 +1,108 @@
+"""
+This module computes the market overview from the shared listing snapshot.
+
+The overview is computed once per snapshot, the first time it is asked for,
+and served from memory until the listing is refreshed:
+- totals: market cap and 24h volume summed over the listed coins, with
+  `math.fsum` running over the snapshot's float64 columns in place;
+- dominance: the share of the total market cap held by BTC and ETH;
+- top movers: the largest gainers and losers by percent change over 1h,
+  24h and 7d, chosen with `heapq` in O(n log k), not by sorting the
+  listing. Coins trading less than MARKET_MOVERS_MIN_VOLUME a day are left
+  out, as their prices swing on a handful of trades, and so are coins
+  with a missing price, change, market cap or volume.
+
+Functions:
+- compute_overview(snapshot, top_n, min_volume): Build the overview of a snapshot.
+- market_overview(): The overview of the current listing, memoized per snapshot.
+"""
+
+import heapq
+import math
+import threading
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from src.utils.data_format_utils import transform_data
+
+# CoinMarketCap ids
+DOMINANCE_COINS = {"btc": 1, "eth": 1027}
+MOVER_PERIODS = ("1h", "24h", "7d")
+# Quote fields `transform_data` rounds: a mover missing any of them cannot be shown
+MOVER_FIELDS = ("price", "volume_24h", "percent_change_1h", "percent_change_24h", "percent_change_7d", "market_cap")
+
+_memo_lock = threading.Lock()
+_memo = (None, None)
+
+
+def _finite_sum(values):
+    return math.fsum(filter(math.isfinite, values))
+
+
+def compute_overview(snapshot, top_n, min_volume):
+    """
+    Build the market overview of a listing snapshot.
+
+    :param snapshot: A MarketSnapshot
+    :param top_n: Gainers and losers reported per period
+    :param min_volume: Minimum 24h volume in USD for a coin to count as a mover
+    :return: Dict with the totals, dominance percentages and top movers
+    """
+    market_caps = snapshot.column("market_cap")
+    total_market_cap = _finite_sum(market_caps)
+    ids = snapshot.column("id")
+    rows = {coin_id: i for i, coin_id in enumerate(ids) if coin_id in DOMINANCE_COINS.values()}
+    dominance = {}
+    for symbol, coin_id in DOMINANCE_COINS.items():
+        market_cap = market_caps[rows[coin_id]] if coin_id in rows else math.nan
+        dominance[symbol] = (round(market_cap / total_market_cap * 100, 2)
+                             if total_market_cap and math.isfinite(market_cap) else None)
+
+    volumes = snapshot.column("volume_24h")
+    liquid = [i for i, volume in enumerate(volumes) if volume >= min_volume]  # NaN compares False
+    for name in MOVER_FIELDS:
+        column = snapshot.column(name)
+        liquid = [i for i in liquid if math.isfinite(column[i])]
+    movers = {}
+    for period in MOVER_PERIODS:
+        changes = snapshot.column(f"percent_change_{period}")
+        gainers = heapq.nlargest(top_n, liquid, key=changes.__getitem__)
+        losers = heapq.nsmallest(top_n, liquid, key=changes.__getitem__)
+        movers[period] = {
+            "gainers": transform_data(snapshot.items(gainers))["data"],
+            "losers": transform_data(snapshot.items(losers))["data"],
+        }
+
+    return {
+        "updated_at": datetime.fromtimestamp(snapshot.fetched_at, timezone.utc).isoformat(),
+        "listed_coins": len(snapshot),
+        "total_coins": snapshot.total_count,
+        "total_market_cap": round(total_market_cap, 2),
+        "total_volume_24h": round(_finite_sum(volumes), 2),
+        "dominance": dominance,
+        "movers": movers,
+    }
+
+
+def market_overview():
+    """
+    Return the overview of the current market listing.
+
+    :return: The overview dict, or None if no listing is available
+    """
+    global _memo
+    from src import market_listing
+
+    snapshot = market_listing.get()
+    if snapshot is None:
+        return None
+    cached_snapshot, overview = _memo
+    if cached_snapshot is snapshot:
+        return overview
+    with _memo_lock:
+        if _memo[0] is not snapshot:
+            config = current_app.config
+            _memo = (snapshot, compute_overview(snapshot, config["MARKET_MOVERS_TOP_N"],
+                                                config["MARKET_MOVERS_MIN_VOLUME"]))
+        return _memo[1]
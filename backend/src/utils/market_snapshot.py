@@ -0,0 +1,416 @@
+"""
+This module keeps the latest CoinMarketCap listing in a persisted snapshot.
+
+The home page and coin search read from one shared listing of the top
+MARKET_LISTING_LIMIT coins. The listing is refreshed at most every
+MARKET_LISTING_TIMEOUT seconds. CoinMarketCap bills one credit per 200
+listed coins, so each refresh costs ceil(MARKET_LISTING_LIMIT / 200)
+credits: the default 200 coins every 60 s is 1 credit a minute, the same as
+refreshing the first home page on its own, while 5000 coins would cost 25.
+Home pages past the listing are fetched on their own, and search only
+covers the listed coins. Each refresh is written to
+MARKET_SNAPSHOT_PATH and loaded back with `mmap`, which gives:
+- a warm start: a restarted worker serves the last snapshot immediately,
+  instead of blocking on CoinMarketCap with an empty cache;
+- graceful degradation: when CoinMarketCap fails (an outage or a bad API
+  key), the last snapshot is served, and the call is retried after
+  MARKET_LISTING_RETRY seconds rather than on every request;
+- shared memory: all workers map the same read-only file, so its pages
+  are in memory once. A worker picks up a snapshot written by another
+  worker on its next read, and only one worker at a time refreshes,
+  under an exclusive lock on `<path>.lock`.
+
+File format (version 1, little-endian):
+- Header: magic b"CMXSNAP\\0", format version (u16), column count (u16),
+  row count (u32), CoinMarketCap total_count (u32), fetched_at (f64, Unix
+  time), 4 padding bytes.
+- Column directory: per column, its name (32 bytes, NUL padded), kind
+  (b"q" int64, b"d" float64, b"s" string), 7 padding bytes, and the offset
+  and size of its data (u64 each).
+- Column data, 8-byte aligned. Numeric columns are packed arrays, readable
+  in place through `memoryview.cast`; NaN stands for a missing value.
+  String columns hold row count + 1 u32 offsets followed by UTF-8 bytes.
+
+A file with another magic or version is ignored and replaced by the next
+refresh. Files are written to a temporary name and renamed over the old
+one, so readers never see a partial snapshot.
+
+Classes:
+- MarketSnapshot: Read-only view of one listing snapshot.
+- MarketListing: Flask extension serving, refreshing and persisting the
+  listing.
+
+Functions:
+- encode_snapshot(items, total_count, fetched_at): Serialize a listing.
+- write_snapshot(path, data): Atomically replace the snapshot file.
+- load_snapshot(path): Memory-map a snapshot file.
+"""
+
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock: workers then refresh independently
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CMXSNAP\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHIId4x")
+_COLUMN = struct.Struct("<32sc7xQQ")
+_OFFSETS = struct.Struct("<I")
+
+LISTINGS_PATH = "/v1/cryptocurrency/listings/latest"
+ITEM_COLUMNS = (("id", b"q"), ("cmc_rank", b"q"), ("name", b"s"), ("symbol", b"s"), ("slug", b"s"),
+                ("circulating_supply", b"d"))
+QUOTE_COLUMNS = ("price", "volume_24h", "percent_change_1h", "percent_change_24h", "percent_change_7d",
+                 "market_cap", "market_cap_dominance")
+COLUMNS = ITEM_COLUMNS + tuple((name, b"d") for name in QUOTE_COLUMNS)
+
+
+def _pad(size):
+    return -size % 8
+
+
+def encode_snapshot(items, total_count, fetched_at):
+    """
+    Serialize CoinMarketCap listing items in the snapshot format.
+
+    :param items: CoinMarketCap listing items, in rank order
+    :param total_count: Number of coins CoinMarketCap tracks
+    :param fetched_at: Unix time the listing was fetched
+    :return: The snapshot bytes
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("Market snapshots are only supported on little-endian hosts")
+    rows = []
+    for item in items:
+        quote = item.get("quote", {}).get("USD", {})
+        rows.append([item.get(name) for name, _ in ITEM_COLUMNS] + [quote.get(name) for name in QUOTE_COLUMNS])
+
+    blobs = []
+    for index, (name, kind) in enumerate(COLUMNS):
+        values = [row[index] for row in rows]
+        if kind == b"q":
+            blob = array("q", (int(value or 0) for value in values)).tobytes()
+        elif kind == b"d":
+            blob = array("d", (math.nan if value is None else float(value) for value in values)).tobytes()
+        else:
+            encoded = [(value or "").encode() for value in values]
+            offsets, position = array("I", [0]), 0
+            for text in encoded:
+                position += len(text)
+                offsets.append(position)
+            blob = offsets.tobytes() + b"".join(encoded)
+        blobs.append(blob)
+
+    position = _HEADER.size + _COLUMN.size * len(COLUMNS)
+    directory, body = [], []
+    for (name, kind), blob in zip(COLUMNS, blobs):
+        padding = _pad(position)
+        body.append(b"\0" * padding + blob)
+        position += padding
+        directory.append(_COLUMN.pack(name.encode(), kind, position, len(blob)))
+        position += len(blob)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(COLUMNS), len(rows), total_count or 0, fetched_at)
+    return b"".join([header, *directory, *body])
+
+
+def write_snapshot(path, data):
+    """
+    Atomically replace the snapshot file with `data`.
+
+    :param path: Snapshot file path; its directory is created if needed
+    :param data: Bytes from `encode_snapshot`
+    :raises OSError: If the file cannot be written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_snapshot(path):
+    """
+    Memory-map a snapshot file.
+
+    :param path: Snapshot file path
+    :return: A MarketSnapshot, or None if the file is missing, unreadable or
+        of another format version
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # Missing, unreadable or empty
+        return None
+    try:
+        return MarketSnapshot(buffer)
+    except ValueError as e:
+        logger.warning(f"Ignoring market snapshot {path}: {e}")
+        return None
+
+
+class MarketSnapshot:
+    """
+    Read-only view of a listing snapshot held in `bytes` or an `mmap`.
+
+    Numeric columns are read in place; string columns are decoded on first
+    use. `items` rebuilds CoinMarketCap-shaped items, so existing formatting
+    code works on snapshot rows unchanged.
+    """
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("truncated header")
+        magic, version, column_count, rows, total_count, fetched_at = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("not a market snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"format version {version}, expected {FORMAT_VERSION}")
+        if sys.byteorder != "little":
+            raise ValueError("snapshots are little-endian")
+
+        if _HEADER.size + column_count * _COLUMN.size > len(view):
+            raise ValueError("truncated column directory")
+
+        self._buffer = buffer
+        self._view = view
+        self.rows = rows
+        self.total_count = total_count
+        self.fetched_at = fetched_at
+        self._columns = {}
+        self._strings = {}
+        for index in range(column_count):
+            raw_name, kind, offset, size = _COLUMN.unpack_from(view, _HEADER.size + index * _COLUMN.size)
+            if offset + size > len(view):
+                raise ValueError("truncated column data")
+            self._columns[raw_name.rstrip(b"\0").decode()] = (kind, view[offset:offset + size])
+        missing = {name for name, _ in COLUMNS} - self._columns.keys()
+        if missing:
+            raise ValueError(f"missing columns {sorted(missing)}")
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """
+        Return one column.
+
+        :param name: Column name, e.g. "id", "symbol" or "percent_change_24h"
+        :return: A memoryview over int64/float64 values (NaN for missing
+            floats), or a list of str for string columns
+        """
+        kind, data = self._columns[name]
+        if kind != b"s":
+            return data.cast(kind.decode())
+        strings = self._strings.get(name)
+        if strings is None:
+            offsets = data[:(self.rows + 1) * _OFFSETS.size].cast("I")
+            text = bytes(data[(self.rows + 1) * _OFFSETS.size:])
+            strings = [text[offsets[i]:offsets[i + 1]].decode() for i in range(self.rows)]
+            self._strings[name] = strings
+        return strings
+
+    def covers(self, start, stop):
+        """True if rows [start, stop) are all in the snapshot, or it holds the whole market."""
+        return start < self.rows and (stop <= self.rows or self.rows >= self.total_count)
+
+    def items(self, indices=None):
+        """
+        Rebuild CoinMarketCap-shaped listing items.
+
+        :param indices: Row indices or a slice (default: every row)
+        :return: List of dicts with the snapshot's fields and `quote.USD`
+        """
+        if indices is None:
+            indices = range(self.rows)
+        elif isinstance(indices, slice):
+            indices = range(*indices.indices(self.rows))
+        columns = {name: self.column(name) for name, _ in COLUMNS}
+        items = []
+        for i in indices:
+            item = {name: columns[name][i] for name, _ in ITEM_COLUMNS}
+            quote = {}
+            for name in QUOTE_COLUMNS:
+                value = columns[name][i]
+                quote[name] = None if math.isnan(value) else value
+            if math.isnan(item["circulating_supply"]):
+                item["circulating_supply"] = None
+            item["quote"] = {"USD": quote}
+            items.append(item)
+        return items
+
+    def search(self, query):
+        """
+        Find rows whose name, symbol or slug contains `query`, in rank order.
+
+        :param query: Lowercase search text
+        :return: List of row indices
+        """
+        keys = self._strings.get("_search")
+        if keys is None:
+            keys = [f"{name}\0{symbol}\0{slug}".lower() for name, symbol, slug in
+                    zip(self.column("name"), self.column("symbol"), self.column("slug"))]
+            self._strings["_search"] = keys
+        return [i for i, key in enumerate(keys) if query in key]
+
+
+class MarketListing:
+    """
+    The shared market listing, refreshed from CoinMarketCap on demand.
+
+    Configuration keys:
+    - MARKET_SNAPSHOT_PATH: snapshot file; unset keeps the listing in memory.
+    - MARKET_LISTING_LIMIT: number of coins in the listing.
+    - MARKET_LISTING_TIMEOUT: seconds before the listing is refreshed.
+    - MARKET_LISTING_RETRY: seconds to wait after a failed refresh.
+    """
+
+    def __init__(self, app=None):
+        self.snapshot = None
+        self.path = None
+        self._stat = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["market_listing"] = self
+        self.path = app.config.get("MARKET_SNAPSHOT_PATH")
+        if self.path and self._reload():
+            age = time.time() - self.snapshot.fetched_at
+            logger.info(f"Loaded market snapshot of {len(self.snapshot)} coins, {age:.0f}s old")
+
+    def _reload(self):
+        """Map the snapshot file if it changed since it was last loaded."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return False
+        snapshot = load_snapshot(self.path)
+        self._stat = key
+        if snapshot is None or (self.snapshot is not None and snapshot.fetched_at <= self.snapshot.fetched_at):
+            return False
+        self.snapshot = snapshot
+        return True
+
+    def _fresh(self, snapshot):
+        return snapshot is not None and time.time() - snapshot.fetched_at < current_app.config["MARKET_LISTING_TIMEOUT"]
+
+    def get(self):
+        """
+        Return the current listing, refreshing it first when stale.
+
+        A stale listing is served while another thread or worker refreshes
+        it, or while CoinMarketCap is failing.
+
+        :return: A MarketSnapshot, or None if no listing was ever fetched
+            and CoinMarketCap is unavailable
+        """
+        if self.path:
+            self._reload()
+        snapshot = self.snapshot
+        if self._fresh(snapshot) or time.monotonic() < self._retry_at:
+            return snapshot
+        # Only the first request without any data waits for the refresh
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            with self._file_lock(blocking=snapshot is None) as locked:
+                if locked:
+                    if self.path:
+                        self._reload()  # Another worker may have just refreshed
+                    if not self._fresh(self.snapshot):
+                        self._refresh()
+        finally:
+            self._lock.release()
+        return self.snapshot
+
+    def refresh(self):
+        """
+        Fetch the listing from CoinMarketCap now, e.g. to warm the snapshot
+        during a deploy.
+
+        :return: The new MarketSnapshot, or None if the fetch failed
+        """
+        with self._lock, self._file_lock(blocking=True):
+            before = self.snapshot
+            self._refresh()
+            return self.snapshot if self.snapshot is not before else None
+
+    @contextmanager
+    def _file_lock(self, blocking):
+        """Hold an exclusive lock on `<path>.lock` so one worker refreshes at a time."""
+        fd, locked = None, True
+        if self.path and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                locked = False
+            except OSError as e:
+                logger.warning(f"Cannot lock the market snapshot, refreshing anyway: {e}")
+        try:
+            yield locked
+        finally:
+            if fd is not None:
+                os.close(fd)  # Also releases the lock
+
+    def _refresh(self):
+        import requests
+        from src import price_alerts
+        from src.utils.market_data import cmc_get
+
+        config = current_app.config
+        try:
+            response = cmc_get(LISTINGS_PATH, params={"limit": config["MARKET_LISTING_LIMIT"], "convert": "USD"})
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self._retry_at = time.monotonic() + config["MARKET_LISTING_RETRY"]
+            logger.error(f"Failed to refresh the market listing from CoinMarketCap: {e}")
+            return
+
+        items = payload.get("data", [])
+        fetched_at = time.time()
+        data = encode_snapshot(items, payload.get("status", {}).get("total_count", len(items)), fetched_at)
+        if self.path:
+            try:
+                write_snapshot(self.path, data)
+                self._reload()
+            except OSError as e:
+                logger.error(f"Failed to write the market snapshot to {self.path}: {e}")
+        if self.snapshot is None or self.snapshot.fetched_at < fetched_at:
+            self.snapshot = MarketSnapshot(data)  # Not persisted: keep it in memory
+        price_alerts.evaluate(items)
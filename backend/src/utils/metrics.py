@@ -0,0 +1,247 @@
+"""
+This module records request, database and upstream timings as histograms and
+renders them in the Prometheus text format.
+
+Recording an observation is one bisect over fixed bucket bounds and a few
+integer increments under a lock, so instrumentation stays cheap on every
+request and every SQL statement.
+
+Gunicorn runs several worker processes, and each one only sees its own
+traffic. When METRICS_DIR is set, every worker writes a snapshot of its
+histograms to `<dir>/<pid>-<id>.json` at most every METRICS_FLUSH_INTERVAL
+seconds. `/metrics` then sums all the snapshot files with the serving
+worker's live numbers. Files of exited workers are kept so counters never go
+backwards; point METRICS_DIR at a directory that is emptied on deploy.
+
+Histograms:
+- http_request_duration_seconds{endpoint, method, status}
+- http_request_db_statements{endpoint}: SQL statements run by one request
+- db_statement_duration_seconds{operation}
+- upstream_request_duration_seconds{service, endpoint, status}
+
+Classes:
+- Metrics: Flask extension holding the histograms of this process.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+from flask import g, request, has_request_context
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": (
+        "Time spent handling HTTP requests.", ("endpoint", "method", "status"), LATENCY_BUCKETS),
+    "http_request_db_statements": (
+        "SQL statements executed per HTTP request.", ("endpoint",), STATEMENT_COUNT_BUCKETS),
+    "db_statement_duration_seconds": (
+        "Time spent executing SQL statements.", ("operation",), DB_LATENCY_BUCKETS),
+    "upstream_request_duration_seconds": (
+        "Time spent calling upstream APIs.", ("service", "endpoint", "status"), LATENCY_BUCKETS),
+}
+
+_SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """
+    Per-process histograms with request and SQLAlchemy hooks.
+
+    Configuration keys:
+    - METRICS_DIR: shared directory for per-worker snapshots (optional).
+    - METRICS_FLUSH_INTERVAL: seconds between snapshot writes.
+    """
+
+    def __init__(self, app=None):
+        # (name, label values) -> [bucket counts..., sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+        self._directory = None
+        self._flush_interval = 5
+        self._last_flush = 0.0
+        self._pid = None
+        self._snapshot_name = None
+        self._check_fork()
+        self._engine_hooked = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._directory = app.config.get("METRICS_DIR")
+        self._flush_interval = app.config.get("METRICS_FLUSH_INTERVAL", 5)
+        if self._directory:
+            os.makedirs(self._directory, exist_ok=True)
+            # Keep the last few seconds of a worker that is shutting down
+            atexit.register(self.flush)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        self._hook_engine()
+        app.extensions["metrics"] = self
+
+    def _check_fork(self):
+        """Start fresh in a worker forked from a preloaded master process."""
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._snapshot_name = f"{pid}-{uuid.uuid4().hex[:8]}.json"
+            self._lock = threading.Lock()
+            self._series = {}
+
+    def observe(self, name, labels, value):
+        """
+        Record one observation.
+
+        :param name: Histogram name, a key of HISTOGRAMS
+        :param labels: Tuple of label values in the histogram's label order
+        :param value: Observed value (seconds or a count)
+        """
+        buckets = HISTOGRAMS[name][2]
+        index = bisect_left(buckets, value)
+        key = (name, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(buckets) + 3)
+            series[index] += 1  # the slot after the last bound is +Inf
+            series[-2] += value
+            series[-1] += 1
+
+    def observe_upstream(self, service, endpoint, seconds, status):
+        self.observe("upstream_request_duration_seconds", (service, endpoint, str(status)), seconds)
+
+    # Request hooks
+
+    def _start_request(self):
+        self._check_fork()
+        g._metrics_start = time.perf_counter()
+        g._metrics_statements = 0
+
+    def _finish_request(self, response):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return response
+        endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+        self.observe("http_request_duration_seconds",
+                     (endpoint, request.method, str(response.status_code)), time.perf_counter() - start)
+        self.observe("http_request_db_statements", (endpoint,), g.pop("_metrics_statements", 0))
+        if self._directory and time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+        return response
+
+    # SQLAlchemy hooks
+
+    def _hook_engine(self):
+        if self._engine_hooked:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(Engine, "handle_error", self._handle_error)
+        self._engine_hooked = True
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_metrics_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        operation = statement.lstrip()[:6].upper()
+        self.observe("db_statement_duration_seconds",
+                     (operation if operation in _SQL_OPERATIONS else "OTHER",), elapsed)
+        if has_request_context() and "_metrics_statements" in g:
+            g._metrics_statements += 1
+
+    @staticmethod
+    def _handle_error(context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        starts = context.connection.info.get("_metrics_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    # Aggregation and exposition
+
+    def _snapshot(self):
+        with self._lock:
+            return [[name, list(labels), list(series)] for (name, labels), series in self._series.items()]
+
+    def flush(self):
+        """Write this worker's snapshot to METRICS_DIR atomically."""
+        if not self._directory:
+            return
+        self._last_flush = time.monotonic()
+        path = os.path.join(self._directory, self._snapshot_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _collect(self):
+        """Merge the live series with the snapshots of every other worker."""
+        merged = {}
+
+        def add(entries):
+            for name, labels, series in entries:
+                if name not in HISTOGRAMS:
+                    continue
+                key = (name, tuple(labels))
+                total = merged.get(key)
+                if total is None or len(total) != len(series):
+                    merged[key] = list(series)
+                else:
+                    for index, value in enumerate(series):
+                        total[index] += value
+
+        add(self._snapshot())
+        if self._directory:
+            for filename in os.listdir(self._directory):
+                if not filename.endswith(".json") or filename == self._snapshot_name:
+                    continue
+                try:
+                    with open(os.path.join(self._directory, filename)) as f:
+                        add(json.load(f))
+                except (OSError, ValueError):
+                    continue  # Being replaced or unreadable; picked up on the next scrape
+        return merged
+
+    def render(self):
+        """
+        Render every histogram in the Prometheus text exposition format.
+
+        :return: The response body
+        """
+        merged = self._collect()
+        lines = []
+        for name, (help_text, label_names, buckets) in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (series_name, labels), series in sorted(merged.items()):
+                if series_name != name:
+                    continue
+                label_text = ",".join(f'{label}="{_escape(value)}"' for label, value in zip(label_names, labels))
+                prefix = f"{label_text}," if label_text else ""
+                cumulative = 0
+                for bound, count in zip(buckets, series):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+                lines.append(f"{name}_sum{{{label_text}}} {series[-2]}")
+                lines.append(f"{name}_count{{{label_text}}} {series[-1]}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+"""
+This module contains pagination helpers for listings ordered newest first on
+`(created_at, id)`.
+
+Two modes are supported:
+- cursor (keyset) mode, selected with `?cursor=` (empty for the first page),
+  which seeks with `WHERE (created_at, id) < (:created_at, :id)` on a
+  composite index and never counts rows unless `?include_total=true`;
+- page mode (`?page=`), kept for existing clients, which uses OFFSET but reads
+  the total from the cache instead of running COUNT(*) on every page.
+
+Functions:
+- encode_cursor(created_at, item_id): Build an opaque cursor.
+- decode_cursor(cursor): Parse a cursor built by `encode_cursor`.
+- cached_count(query, cache_key): Count rows, cached for a short time.
+- paginate(query, model, args, count_key): Paginate a query from request args,
+  at most `MAX_LIMIT` rows per page.
+"""
+
+import base64
+import math
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from src import cache
+from src.utils.db_replicas import primary_reads
+
+COUNT_CACHE_TIMEOUT = 60
+MAX_LIMIT = 100
+
+
+def encode_cursor(created_at, item_id):
+    """
+    Build an opaque cursor pointing just after the given row.
+
+    :param created_at: The row's `created_at`
+    :param item_id: The row's primary key
+    :return: URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Parse a cursor built by `encode_cursor`.
+
+    :param cursor: The cursor string
+    :return: Tuple of (created_at, item_id)
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, item_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def cached_count(query, cache_key):
+    """
+    Count the rows of a query, caching the result for `COUNT_CACHE_TIMEOUT`.
+    The count runs on the primary, since the key is usually versioned.
+
+    :param query: The SQLAlchemy query to count
+    :param cache_key: Cache key for the total
+    :return: The row count
+    """
+    total = cache.get(cache_key)
+    if total is None:
+        with primary_reads():
+            total = query.order_by(None).count()
+        cache.set(cache_key, total, timeout=COUNT_CACHE_TIMEOUT)
+    return total
+
+
+def paginate(query, model, args, count_key):
+    """
+    Paginate a query newest first, in cursor or page mode depending on `args`.
+
+    :param query: The filtered SQLAlchemy query
+    :param model: Model exposing `created_at` and `id` columns
+    :param args: The request arguments
+    :param count_key: Cache key for the total row count
+    :return: Tuple of (items, metadata dict)
+    :raises ValueError: If `page`, `limit` or `cursor` is malformed
+    """
+    try:
+        limit = int(args.get('limit', 20))
+        page = max(int(args.get('page', 1)), 1)
+    except ValueError:
+        raise ValueError("page and limit must be integers") from None
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    limit = min(limit, MAX_LIMIT)
+    ordered = query.order_by(model.created_at.desc(), model.id.desc())
+
+    if 'cursor' in args:
+        cursor = args.get('cursor')
+        seek = ordered
+        if cursor:
+            created_at, item_id = decode_cursor(cursor)
+            seek = ordered.filter(tuple_(model.created_at, model.id) < (created_at, item_id))
+        # Fetch one extra row to learn whether another page exists
+        items = seek.limit(limit + 1).all()
+        has_more = len(items) > limit
+        items = items[:limit]
+        meta = {"limit": limit}
+        if args.get('include_total', '').lower() == 'true':
+            meta["total_items"] = cached_count(query, count_key)
+    else:
+        items = ordered.offset((page - 1) * limit).limit(limit).all()
+        total = cached_count(query, count_key)
+        has_more = page * limit < total
+        meta = {
+            "page": page,
+            "total_pages": math.ceil(total / limit),
+            "total_items": total,
+            "limit": limit,
+        }
+
+    meta["next_cursor"] = encode_cursor(items[-1].created_at, items[-1].id) if has_more and items else None
+    return items, meta
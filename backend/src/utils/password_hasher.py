@@ -0,0 +1,149 @@
+"""
+This module runs password hashing and verification on a bounded worker pool so
+that a burst of logins or registrations cannot tie up every request worker.
+
+pbkdf2 is computed by hashlib, which releases the GIL, so a small thread pool
+gives real parallelism without pickling secrets across process boundaries.
+
+The passlib `CryptContext` is built on first use, so processes that never
+touch a password do not pay for importing passlib.
+
+Classes:
+- PasswordHasher: Flask extension wrapping the shared `CryptContext`.
+- PasswordHasherBusy: Raised when too many hash jobs are already queued.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the job was rejected."""
+
+
+class PasswordHasher:
+    """
+    Offload `CryptContext` hash/verify calls to a bounded thread pool.
+
+    Configuration keys:
+    - PASSWORD_HASH_ROUNDS: pbkdf2 rounds for new hashes; older hashes with
+      fewer rounds are upgraded on the next successful login.
+    - PASSWORD_HASH_WORKERS: number of hashing threads.
+    - PASSWORD_HASH_MAX_PENDING: running + queued jobs allowed before new
+      jobs are rejected with `PasswordHasherBusy`.
+
+    Bulk jobs (`hash_many`) have their own, smaller allowance of half the
+    worker threads. They never take the interactive slots, and always leave
+    threads free for logins and registrations. With a single worker thread
+    the allowance is zero and bulk jobs hash in the calling thread.
+    """
+
+    def __init__(self, context=None, app=None):
+        self._context = context
+        self._rounds = None
+        self._context_lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._bulk_slots = None
+        if app is not None:
+            self.init_app(app)
+
+    @property
+    def context(self):
+        """The `CryptContext`, created with the configured rounds on first use."""
+        if self._context is None:
+            with self._context_lock:
+                if self._context is None:
+                    from passlib.context import CryptContext
+                    context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+                    self._apply_rounds(context)
+                    self._context = context
+        return self._context
+
+    def _apply_rounds(self, context):
+        if self._rounds:
+            context.update(
+                pbkdf2_sha256__default_rounds=self._rounds,
+                pbkdf2_sha256__min_rounds=self._rounds,
+            )
+
+    def init_app(self, app):
+        self._rounds = app.config.get("PASSWORD_HASH_ROUNDS")
+        if self._context is not None:
+            self._apply_rounds(self._context)
+
+        workers = app.config.get("PASSWORD_HASH_WORKERS") or min(4, os.cpu_count() or 1)
+        max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING") or workers * 8
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._bulk_slots = threading.BoundedSemaphore(workers // 2) if workers > 1 else None
+        app.extensions["password_hasher"] = self
+
+    def _submit(self, fn, *args):
+        if self._executor is None:
+            # Not bound to an app (e.g. a shell script): hash inline.
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password hashing requests, try again later.")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """
+        Hash a password with the configured rounds.
+
+        :param password: The plain-text password
+        :return: The encoded hash
+        :raises PasswordHasherBusy: If the hashing queue is full
+        """
+        return self._submit(self.context.hash, password)
+
+    def hash_many(self, passwords):
+        """
+        Hash several passwords in parallel for bulk jobs.
+
+        Unlike `hash`, this waits for free bulk slots instead of rejecting.
+        A large batch runs on at most half the worker threads, or in the
+        calling thread if there is only one, and leaves the interactive
+        queue untouched.
+
+        :param passwords: Iterable of plain-text passwords
+        :return: List of encoded hashes in input order
+        """
+        if self._executor is None or self._bulk_slots is None:
+            return [self.context.hash(password) for password in passwords]
+        futures = []
+        for password in passwords:
+            self._bulk_slots.acquire()
+            future = self._executor.submit(self.context.hash, password)
+            future.add_done_callback(lambda _: self._bulk_slots.release())
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def verify_and_update(self, password, hashed):
+        """
+        Verify a password and compute a replacement hash if the stored one is
+        outdated according to `CryptContext.needs_update`.
+
+        :param password: The plain-text password
+        :param hashed: The stored hash
+        :return: Tuple of (is_valid, new_hash or None)
+        :raises PasswordHasherBusy: If the hashing queue is full
+        """
+        return self._submit(self._verify_and_update, password, hashed)
+
+    def _verify_and_update(self, password, hashed):
+        if not self.context.verify(password, hashed):
+            return False, None
+        if self.context.needs_update(hashed):
+            return True, self.context.hash(password)
+        return True, None
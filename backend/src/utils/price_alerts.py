@@ -0,0 +1,235 @@
+"""
+This module evaluates users' price alerts against fresh market listings.
+
+Active alerts live in an in-memory inverted index keyed by coin id. Each coin
+keeps its "above" and "below" thresholds in sorted lists, so a single bisect
+per coin finds every alert a new price has crossed.
+
+Alerts fire on a crossing, not on a level: the index remembers the last
+price it saw for each coin, and an alert fires when a new price lands on
+the other side of its threshold, e.g. an above-alert at 100 fires when
+the price goes from 98 to 101, not when it goes from 101 to 103. The first
+price seen for a coin only sets the reference. Above-alerts crossed from
+`previous` to `price` are the thresholds in (previous, price], a slice of
+their sorted list; below-alerts likewise. Evaluating a snapshot costs two
+bisects per watched coin plus the number of alerts that fire, however many
+are waiting.
+
+Fired alerts are marked in the database with one executemany, on a
+connection of their own so the caller's session (often a GET request's) is
+never committed, and removed from the index. The UPDATE only matches
+still-active rows, so when several workers evaluate the same snapshot each
+alert is triggered once.
+
+Each process holds its own index. Creating or deleting an alert bumps the
+"price_alerts" version token in the database (see `cache_versions`); a
+process that sees a version it did not write rebuilds its index from the
+database before the next evaluation.
+
+Classes:
+- PriceAlertIndex: Inverted index of active alerts, a Flask extension.
+"""
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from src.utils.db_replicas import primary_reads
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ("above", "below")
+ALERTS_VERSION = "price_alerts"
+
+
+class _CoinAlerts:
+    """Sorted thresholds for one coin with alert ids kept in parallel lists."""
+
+    __slots__ = ("above", "above_ids", "below", "below_ids")
+
+    def __init__(self):
+        self.above, self.above_ids = [], []
+        self.below, self.below_ids = [], []
+
+    def add(self, alert_id, direction, threshold):
+        thresholds, ids = (self.above, self.above_ids) if direction == "above" else (self.below, self.below_ids)
+        index = bisect_right(thresholds, threshold)
+        thresholds.insert(index, threshold)
+        ids.insert(index, alert_id)
+
+    def remove(self, alert_id):
+        for thresholds, ids in ((self.above, self.above_ids), (self.below, self.below_ids)):
+            if alert_id in ids:
+                index = ids.index(alert_id)
+                del thresholds[index], ids[index]
+
+    def pop_crossed(self, previous, price):
+        """Remove and return the ids of alerts crossed moving from `previous` to `price`."""
+        fired = []
+        if price > previous:
+            start, end = bisect_right(self.above, previous), bisect_right(self.above, price)
+            fired += self.above_ids[start:end]
+            del self.above[start:end], self.above_ids[start:end]
+        elif price < previous:
+            start, end = bisect_left(self.below, price), bisect_left(self.below, previous)
+            fired += self.below_ids[start:end]
+            del self.below[start:end], self.below_ids[start:end]
+        return fired
+
+    def __bool__(self):
+        return bool(self.above or self.below)
+
+
+class PriceAlertIndex:
+    """
+    Index of active price alerts, evaluated on every market listing refresh.
+
+    Usage:
+        price_alerts = PriceAlertIndex()
+        price_alerts.init_app(app)
+        price_alerts.evaluate(listings)
+    """
+
+    def __init__(self, app=None):
+        self._coins = {}
+        self._prices = {}  # Last price seen per coin, the reference for crossings
+        self._version = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["price_alerts"] = self
+
+    @staticmethod
+    def _shared_version():
+        from src.utils.cache_versions import get_version
+
+        return get_version(ALERTS_VERSION)
+
+    @staticmethod
+    def _bump():
+        from src.utils.cache_versions import bump_version
+
+        return bump_version(ALERTS_VERSION)
+
+    def _load(self, version):
+        from src import db
+        from src.models import PriceAlert
+
+        coins = {}
+        # From the primary: the version may be newer than a replica's data
+        with primary_reads():
+            rows = (
+                db.session.query(PriceAlert.id, PriceAlert.coin_id, PriceAlert.direction, PriceAlert.threshold)
+                .filter(PriceAlert.is_active.is_(True))
+                .order_by(PriceAlert.threshold)
+                .all()
+            )
+        for alert_id, coin_id, direction, threshold in rows:
+            alerts = coins.get(coin_id) or coins.setdefault(coin_id, _CoinAlerts())
+            # Rows arrive sorted by threshold, so appending keeps lists sorted
+            if direction == "above":
+                alerts.above.append(threshold)
+                alerts.above_ids.append(alert_id)
+            else:
+                alerts.below.append(threshold)
+                alerts.below_ids.append(alert_id)
+        self._coins, self._version = coins, version
+
+    def _ensure_current(self):
+        version = self._shared_version()
+        if version != self._version:
+            self._load(version)
+
+    def add(self, alert):
+        """
+        Register a committed alert. It fires on the next crossing of its
+        threshold, even if the price is already past it.
+
+        :param alert: The PriceAlert instance
+        """
+        with self._lock:
+            current = self._version is not None and self._version == self._shared_version()
+            if current:
+                self._coins.setdefault(alert.coin_id, _CoinAlerts()).add(alert.id, alert.direction, alert.threshold)
+            version = self._bump()
+            # A stale index is rebuilt on the next evaluation and picks the alert up from the database
+            if current:
+                self._version = version
+
+    def remove(self, alert):
+        """
+        Forget a deleted alert.
+
+        :param alert: The PriceAlert instance
+        """
+        with self._lock:
+            current = self._version is not None and self._version == self._shared_version()
+            alerts = self._coins.get(alert.coin_id)
+            if current and alerts is not None:
+                alerts.remove(alert.id)
+                if not alerts:
+                    del self._coins[alert.coin_id]
+            version = self._bump()
+            if current:
+                self._version = version
+
+    def evaluate(self, listings):
+        """
+        Trigger every active alert whose threshold the price crossed since the
+        previous evaluation that saw the coin.
+
+        :param listings: CoinMarketCap items (a list, or a dict keyed by id)
+            carrying `quote.USD.price`
+        :return: List of triggered alert ids
+        """
+        from sqlalchemy import update, bindparam
+        from sqlalchemy.exc import SQLAlchemyError
+        from src import db
+        from src.models import PriceAlert
+
+        items = listings.values() if isinstance(listings, dict) else listings
+        prices = {}
+        for item in items:
+            price = item.get("quote", {}).get("USD", {}).get("price")
+            if price is not None:
+                prices[item["id"]] = price
+
+        fired = []
+        with self._lock:
+            self._ensure_current()
+            coins = self._coins
+            watched = prices.keys() & coins.keys() & self._prices.keys()
+            for coin_id in watched:
+                alerts = coins[coin_id]
+                price = prices[coin_id]
+                fired += [(alert_id, price) for alert_id in alerts.pop_crossed(self._prices[coin_id], price)]
+                if not alerts:
+                    del coins[coin_id]
+            self._prices.update(prices)
+
+            if not fired:
+                return []
+
+            now = datetime.utcnow()
+            table = PriceAlert.__table__
+            try:
+                # Core executemany in its own transaction on the primary: the
+                # caller's session is left alone, uncommitted
+                with db.engine.begin() as connection:
+                    connection.execute(
+                        update(table)
+                        .where(table.c.id == bindparam("alert_id"), table.c.is_active.is_(True))
+                        .values(is_active=False, triggered_at=now, triggered_price=bindparam("price")),
+                        [{"alert_id": alert_id, "price": price} for alert_id, price in fired],
+                    )
+            except SQLAlchemyError as e:
+                # Rebuild from the database next time so the alerts are not lost
+                self._version = None
+                logger.error(f"Failed to record triggered price alerts: {e}")
+                return []
+
+        logger.info(f"Triggered {len(fired)} price alerts")
+        return [alert_id for alert_id, _ in fired]
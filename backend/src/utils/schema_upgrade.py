@@ -0,0 +1,59 @@
+"""
+This module brings tables created by older releases up to the current models.
+
+`db.create_all()` creates missing tables but never alters existing ones, so
+nullable columns added to a model later are added here with ALTER TABLE.
+Every step checks the live schema first and is safe to run repeatedly;
+`init_database()` runs them on each `flask init-db`.
+
+Functions:
+- add_missing_columns(model, names): Add the named columns a table lacks.
+- backfill_excerpts(): Compute the excerpt of tips written before it existed.
+"""
+
+from sqlalchemy import inspect, text
+
+from src import db
+
+
+def add_missing_columns(model, names):
+    """
+    Add model columns missing from its existing table. The caller commits.
+
+    :param model: The model whose table to upgrade
+    :param names: Names of nullable columns added after the table's release
+    :return: List of the column names that were added
+    :raises ValueError: If a column is not nullable, so cannot be added to filled tables
+    """
+    table = model.__table__
+    existing = {column["name"] for column in inspect(db.engine).get_columns(table.name)}
+    dialect = db.engine.dialect
+    quote = dialect.identifier_preparer.quote
+    added = []
+    for name in names:
+        if name in existing:
+            continue
+        column = table.columns[name]
+        if not column.nullable:
+            raise ValueError(f"Cannot add NOT NULL column {table.name}.{name} to an existing table")
+        db.session.execute(text(
+            f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(name)} {column.type.compile(dialect=dialect)}"
+        ))
+        added.append(name)
+    return added
+
+
+def backfill_excerpts():
+    """
+    Compute the listing excerpt of tips that have none. The caller commits.
+
+    :return: Number of tips updated
+    """
+    from src.models import Tip
+    from src.schemas.tip import make_excerpt
+
+    count = 0
+    for tip in Tip.query.filter(Tip.excerpt.is_(None)).yield_per(500):
+        tip.excerpt = make_excerpt(tip.description)
+        count += 1
+    return count
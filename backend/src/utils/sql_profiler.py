@@ -0,0 +1,213 @@
+"""
+This module profiles the SQL statements each request runs, for development.
+
+With SQL_PROFILER enabled (the default under FLASK_ENV=development) every
+statement is recorded with its duration and the application line that
+issued it. Each response then carries a summary:
+
+    X-SQL-Profile: queries=7; time=4.1ms; duplicates=1
+    Server-Timing: db;dur=4.1;desc="7 queries"
+
+A statement whose SQL text runs SQL_PROFILER_DUPLICATE_THRESHOLD times or
+more in one request is reported as a likely N+1 query. It is logged as a
+warning together with the call sites that issued it.
+
+`assert_max_queries` enforces a query budget in tests, whatever the
+config. The `max_queries` fixture in tests/conftest.py exposes it:
+
+    with max_queries(3):
+        client.get("/api/v1/auth/me", headers=headers)
+
+The engine listeners are only installed once profiling is used, so
+production pays nothing for this module.
+
+Classes:
+- QueryLog: Statements recorded during a request or a block.
+- SqlProfiler: Flask extension that profiles every request.
+
+Functions:
+- record_queries(): Context manager collecting statements into a QueryLog.
+- assert_max_queries(limit): Fail if a block runs more than `limit` statements.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_active_logs = ContextVar("sql_profiler_logs", default=())
+_hook_lock = threading.Lock()
+_hooked = False
+
+
+class QueryLog:
+    """Statements recorded as (sql, seconds, call site) tuples."""
+
+    def __init__(self):
+        self.entries = []
+
+    @property
+    def count(self):
+        return len(self.entries)
+
+    @property
+    def total_time(self):
+        return sum(seconds for _, seconds, _ in self.entries)
+
+    def duplicates(self, threshold=2):
+        """
+        Find statements that ran repeatedly.
+
+        :param threshold: Minimum number of runs to report
+        :return: Dict of SQL text to (count, sorted distinct call sites)
+        """
+        counts = Counter(sql for sql, _, _ in self.entries)
+        return {
+            sql: (count, sorted({site for text, _, site in self.entries if text == sql and site}))
+            for sql, count in counts.items() if count >= threshold
+        }
+
+    def format(self):
+        """Render the log as readable lines, one per statement."""
+        return "\n".join(f"{seconds * 1000:8.2f} ms  {site or '?'}\n    {sql}" for sql, seconds, site in self.entries)
+
+
+def _call_site():
+    """Return `path:line in function` of the innermost application frame."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_SRC_DIR) and filename != __file__:
+            return f"{os.path.relpath(filename, os.path.dirname(_SRC_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_logs.get():
+        conn.info.setdefault("_profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    logs = _active_logs.get()
+    starts = conn.info.get("_profiler_start")
+    if not logs or not starts:
+        return
+    entry = (" ".join(statement.split()), time.perf_counter() - starts.pop(), _call_site())
+    for log in logs:
+        log.entries.append(entry)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    starts = context.connection.info.get("_profiler_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _hook_engine():
+    global _hooked
+    with _hook_lock:
+        if _hooked:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _hooked = True
+
+
+def _push(log):
+    _hook_engine()
+    return _active_logs.set(_active_logs.get() + (log,))
+
+
+@contextmanager
+def record_queries():
+    """
+    Collect the statements run inside the block.
+
+    :return: Context manager yielding a QueryLog
+    """
+    log = QueryLog()
+    token = _push(log)
+    try:
+        yield log
+    finally:
+        _active_logs.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """
+    Fail if the block runs more than `limit` SQL statements.
+
+    :param limit: Maximum number of statements allowed
+    :raises AssertionError: Listing every statement when over the limit
+    """
+    with record_queries() as log:
+        yield log
+    if log.count > limit:
+        raise AssertionError(f"Expected at most {limit} SQL statements, ran {log.count}:\n{log.format()}")
+
+
+class SqlProfiler:
+    """
+    Per-request SQL profiling for development.
+
+    Configuration keys:
+    - SQL_PROFILER: enable the per-request profiler.
+    - SQL_PROFILER_DUPLICATE_THRESHOLD: runs of one statement in a request
+      that are reported as a likely N+1 query.
+    """
+
+    def __init__(self, app=None):
+        self.duplicate_threshold = 3
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["sql_profiler"] = self
+        if not app.config.get("SQL_PROFILER"):
+            return
+        self.duplicate_threshold = app.config.get("SQL_PROFILER_DUPLICATE_THRESHOLD", 3)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    def _start_request(self):
+        log = QueryLog()
+        g._sql_profile = (log, _push(log))
+
+    def _finish_request(self, response):
+        profile = g.get("_sql_profile")
+        if profile is None:
+            return response
+        log = profile[0]
+
+        duplicates = log.duplicates(self.duplicate_threshold)
+        total_ms = log.total_time * 1000
+        response.headers["X-SQL-Profile"] = f"queries={log.count}; time={total_ms:.1f}ms; duplicates={len(duplicates)}"
+        response.headers.add("Server-Timing", f'db;dur={total_ms:.1f};desc="{log.count} queries"')
+        for sql, (count, sites) in duplicates.items():
+            logger.warning(f"Possible N+1 in {request.method} {request.path}: ran {count} times from "
+                           f"{', '.join(sites) or 'unknown'}: {sql}")
+        return response
+
+    @staticmethod
+    def _teardown_request(exc):
+        # Runs even when the request failed, so the log never outlives it
+        profile = g.pop("_sql_profile", None)
+        if profile is not None:
+            _active_logs.reset(profile[1])
@@ -0,0 +1,140 @@
+"""
+This module applies a batch of admin moderation operations to tips.
+
+Supported actions:
+- activate / deactivate: set `is_active`;
+- set_category: set `category` (requires a `category` value);
+- delete: remove the tip.
+
+All payloads are validated in one `TipSchema(partial=True, many=True)` pass.
+Valid operations are then grouped and run as one set-based UPDATE or DELETE
+per group (one per distinct category for `set_category`), all inside a
+single transaction.
+
+Functions:
+- apply_tip_operations(operations): Run a batch and return per-item results.
+"""
+
+from marshmallow import ValidationError
+from sqlalchemy import update, delete
+
+from src import db
+from src.models import Tip
+from src.schemas.tip import TipSchema
+from src.utils.tip_search import index_tip, remove_tips
+
+ACTIONS = ("activate", "deactivate", "set_category", "delete")
+MAX_OPERATIONS = 1000
+
+
+def _payload(operation):
+    """Translate an operation into the TipSchema fields it writes."""
+    action = operation.get("action")
+    if action == "activate":
+        return {"is_active": True}
+    if action == "deactivate":
+        return {"is_active": False}
+    if action == "set_category":
+        return {"category": operation.get("category")}
+    return {}
+
+
+def _is_tip_id(value):
+    """Tell whether a JSON value is an integer id; booleans are ints in Python but not ids."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _validate(operations):
+    """
+    Check every operation and return `(results, valid)`.
+
+    `results` holds one dict per operation, pre-filled with errors; `valid`
+    maps each accepted tip id to its loaded payload and action.
+    """
+    results = [{"id": operation.get("id"), "action": operation.get("action")} for operation in operations]
+
+    payloads = [_payload(operation) for operation in operations]
+    try:
+        loaded = TipSchema(partial=True, many=True).load(payloads)
+        schema_errors = {}
+    except ValidationError as err:
+        loaded, schema_errors = err.valid_data, err.messages
+
+    # Unknown ids are reported rather than silently skipped
+    ids = [operation.get("id") for operation in operations if _is_tip_id(operation.get("id"))]
+    existing = {tip_id for (tip_id,) in db.session.query(Tip.id).filter(Tip.id.in_(ids))} if ids else set()
+
+    valid, seen = {}, set()
+    for index, (operation, result) in enumerate(zip(operations, results)):
+        tip_id, action = operation.get("id"), operation.get("action")
+        if action not in ACTIONS:
+            result["error"] = f"action must be one of: {', '.join(ACTIONS)}"
+        elif action == "set_category" and not operation.get("category"):
+            result["error"] = {"category": ["Missing data for required field."]}
+        elif index in schema_errors:
+            result["error"] = schema_errors[index]
+        elif not _is_tip_id(tip_id):
+            result["error"] = "id must be an integer"
+        elif tip_id in seen:
+            result["error"] = "Tip appears more than once in the batch"
+        elif tip_id not in existing:
+            result["error"] = "Tip not found"
+        else:
+            seen.add(tip_id)
+            valid[tip_id] = (action, loaded[index])
+    return results, valid
+
+
+def apply_tip_operations(operations):
+    """
+    Validate and apply a batch of tip operations in one transaction.
+
+    :param operations: List of dicts with `id`, `action` and, for
+        `set_category`, `category`
+    :return: Tuple of (per-item results, images of deleted tips)
+    :raises ValueError: If the batch is empty or too large
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations must be a non-empty list")
+    if len(operations) > MAX_OPERATIONS:
+        raise ValueError(f"At most {MAX_OPERATIONS} operations per batch")
+    if not all(isinstance(operation, dict) for operation in operations):
+        raise ValueError("Each operation must be an object")
+
+    results, valid = _validate(operations)
+
+    groups = {}
+    for tip_id, (action, payload) in valid.items():
+        key = (action, payload.get("category"))
+        groups.setdefault(key, []).append(tip_id)
+
+    deleted_ids = groups.pop(("delete", None), [])
+    deleted_images = []
+    try:
+        for (action, category), tip_ids in groups.items():
+            values = {"category": category} if action == "set_category" else {"is_active": action == "activate"}
+            db.session.execute(
+                update(Tip).where(Tip.id.in_(tip_ids)).values(**values).execution_options(synchronize_session=False)
+            )
+            if action == "set_category":
+                # Category is part of the search document
+                for tip in Tip.query.filter(Tip.id.in_(tip_ids)).populate_existing():
+                    index_tip(tip)
+        if deleted_ids:
+            deleted_images = [image for (image,) in db.session.query(Tip.image).filter(Tip.id.in_(deleted_ids))]
+            remove_tips(deleted_ids)
+            db.session.execute(
+                delete(Tip).where(Tip.id.in_(deleted_ids)).execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for result in results:
+            if "error" not in result:
+                result["error"] = f"Batch failed: {e}"
+        return results, []
+
+    for result in results:
+        if "error" not in result:
+            result["status"] = "ok"
+    return results, deleted_images
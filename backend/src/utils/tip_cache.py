@@ -0,0 +1,98 @@
+"""
+This module caches rendered public tip responses under a tips version token.
+
+Every admin write to tips calls `bump_tips_version()` after committing, which
+switches all readers to a fresh key space; stale entries are never served and
+simply expire. Bodies are stored in every content encoding (see
+`compression.precompress`), so compression happens once per cached page.
+The version also seeds the ETag, so clients holding a current
+copy get `304 Not Modified` without the body being loaded or rendered.
+
+The version token is kept in the database (see `cache_versions`), so a
+write in one worker invalidates the cached responses of every worker, even
+with the per-process `SimpleCache`. Cache misses are rendered from the
+primary database, never a read replica.
+
+Functions:
+- get_tips_version(): Return the current tips version token.
+- bump_tips_version(): Invalidate every cached tip response.
+- tip_count_key(scope): Versioned cache key for a listing total.
+- cached_tips_view(fn): Decorator serving a view from the versioned cache.
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import request, current_app, make_response
+
+from src import cache
+from src.utils.cache_versions import get_version, bump_version
+from src.utils.compression import negotiate_encoding, precompress, mark_encoded
+from src.utils.db_replicas import primary_reads
+
+TIPS_VERSION = "tips"
+
+
+def get_tips_version():
+    """Return the current tips version token."""
+    return get_version(TIPS_VERSION)
+
+
+def bump_tips_version():
+    """Invalidate every cached tip page, detail and total. Call after commit."""
+    bump_version(TIPS_VERSION)
+
+
+def tip_count_key(scope):
+    """
+    Build the cache key for a listing total under the current version.
+
+    :param scope: Listing name, e.g. "active" or "all"
+    :return: Cache key string
+    """
+    return f"tips_count_{scope}:{get_tips_version()}"
+
+
+def cached_tips_view(fn):
+    """
+    Serve a JSON tips view from the versioned cache with an ETag.
+
+    Only 200 responses are cached. The key covers the endpoint, its URL
+    arguments and the query string, so each page/limit/cursor is stored once.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        version = get_tips_version()
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+        key = f"tips_view:{version}:{request.endpoint}:{sorted(kwargs.items())}:{query}"
+        etag = hashlib.sha1(key.encode()).hexdigest()
+
+        # Compressed variants carry the weak form of the tag
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        bodies = cache.get(key)
+        if bodies is None:
+            # A lagging replica would store stale tips under the new version
+            with primary_reads():
+                response = make_response(fn(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            bodies = precompress(response.get_data())
+            cache.set(key, bodies, timeout=current_app.config["TIPS_CACHE_TIMEOUT"])
+        elif isinstance(bodies, bytes):
+            # Entry written before bodies were precompressed
+            bodies = {"identity": bodies}
+
+        encoding = negotiate_encoding()
+        response = current_app.response_class(bodies.get(encoding, bodies["identity"]), mimetype="application/json")
+        response.set_etag(etag)
+        if encoding in bodies:
+            mark_encoded(response, encoding)
+        # Let clients keep a copy but revalidate it with If-None-Match
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return wrapper
@@ -0,0 +1,76 @@
+"""
+This module implements sparse fieldsets (`?fields=title,excerpt,...`) for tip
+listings.
+
+Requested fields become a column-level `load_only()` so unrequested columns,
+in particular the HTML `description`, are never read from the database.
+Listings default to every field except `description`; clients use the
+precomputed plain-text `excerpt` instead.
+
+Functions:
+- parse_fields(value): Validate a `fields` argument.
+- load_only_fields(fields): Query option loading only what is needed.
+- serialize_tip(tip, fields): Render a tip restricted to `fields`.
+"""
+
+from sqlalchemy.orm import load_only
+
+from src.models import Tip
+
+TIP_FIELDS = ("id", "title", "description", "excerpt", "created_at", "updated_at", "image", "thumbnail",
+              "renditions", "category", "is_active")
+LIST_DEFAULT_FIELDS = tuple(field for field in TIP_FIELDS if field not in ("description", "renditions"))
+
+# Fields computed from other columns
+_FIELD_COLUMNS = {"thumbnail": ("renditions", "image")}
+
+# Always loaded: they drive ordering and keyset cursors
+_REQUIRED_COLUMNS = ("id", "created_at")
+
+
+def parse_fields(value, default=LIST_DEFAULT_FIELDS):
+    """
+    Validate a comma-separated `fields` argument.
+
+    :param value: The raw argument, or None for the default fieldset
+    :param default: Fields used when `value` is empty
+    :return: Tuple of field names in canonical order
+    :raises ValueError: If an unknown field is requested
+    """
+    if not value:
+        return default
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested.difference(TIP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in TIP_FIELDS if field in requested)
+
+
+def load_only_fields(fields):
+    """
+    Build a query option that loads only the columns needed for `fields`.
+
+    :param fields: Field names returned by `parse_fields`
+    :return: A `load_only` loader option
+    """
+    columns = set(_REQUIRED_COLUMNS)
+    for field in fields:
+        columns.update(_FIELD_COLUMNS.get(field, (field,)))
+    return load_only(*(getattr(Tip, column) for column in TIP_FIELDS if column in columns))
+
+
+def serialize_tip(tip, fields):
+    """
+    Render a tip as a dict restricted to `fields`.
+
+    :param tip: The Tip instance
+    :param fields: Field names returned by `parse_fields`
+    :return: Dict ready for `jsonify`
+    """
+    data = {}
+    for field in fields:
+        value = getattr(tip, field)
+        if field in ("created_at", "updated_at") and value is not None:
+            value = value.isoformat()
+        data[field] = value
+    return data
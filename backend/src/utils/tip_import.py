@@ -0,0 +1,129 @@
+"""
+This module imports tips in bulk from NDJSON or CSV input.
+
+Input is consumed record by record, never loaded whole. Each chunk of
+records is validated and sanitized with one `TipSchema(many=True)` pass
+(record by record if any of them is invalid), inserted with a single
+multi-row INSERT, added to the search index with one executemany and
+committed. After every chunk a progress event reports the
+number of the last committed record; passing it back as `start_after`
+resumes an interrupted import without duplicating earlier chunks.
+
+Functions:
+- iter_records(lines, fmt): Parse NDJSON or CSV lines into dicts.
+- import_tips(records, chunk_size, start_after): Import and yield progress.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from marshmallow import ValidationError, EXCLUDE
+from sqlalchemy import insert
+
+from src import db
+from src.models import Tip
+from src.schemas.tip import TipSchema
+from src.utils.tip_cache import bump_tips_version
+from src.utils.tip_search import index_new_tips
+
+FORMATS = ("ndjson", "csv")
+
+
+def _decode(lines):
+    for line in lines:
+        yield line.decode("utf-8") if isinstance(line, bytes) else line
+
+
+def iter_records(lines, fmt="ndjson"):
+    """
+    Parse input lines into tip records.
+
+    :param lines: Iterable of str or bytes lines (a file or request stream)
+    :param fmt: "ndjson" or "csv" (with a header row)
+    :return: Iterator of dicts, or of `ValueError` instances for bad records
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(_decode(lines)):
+            # Empty cells mean "not provided", not an empty string
+            yield {key: value for key, value in row.items() if key and value not in ("", None)}
+    elif fmt == "ndjson":
+        for line in _decode(lines):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                yield record if isinstance(record, dict) else ValueError("Record must be a JSON object")
+            except ValueError as e:
+                yield e
+    else:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+
+
+def _insert_chunk(rows):
+    """Insert validated rows, index them and commit. Returns the new ids."""
+    ids = db.session.execute(
+        insert(Tip).returning(Tip.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    index_new_tips(Tip(id=tip_id, **row) for tip_id, row in zip(ids, rows))
+    db.session.commit()
+    return ids
+
+
+def import_tips(records, chunk_size=500, start_after=0):
+    """
+    Import tip records chunk by chunk.
+
+    :param records: Iterator from `iter_records`
+    :param chunk_size: Records per transaction
+    :param start_after: Number of leading records to skip (a checkpoint)
+    :return: Generator of progress events; the last one has `"event": "done"`
+    """
+    schema = TipSchema(many=True, unknown=EXCLUDE)
+    record_schema = TipSchema(unknown=EXCLUDE)
+    summary = {"imported": 0, "errors": [], "checkpoint": start_after}
+    numbered = enumerate(records, start=1)
+    if start_after:
+        numbered = islice(numbered, start_after, None)
+
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+
+        candidates = []
+        for number, record in chunk:
+            if isinstance(record, Exception):
+                summary["errors"].append({"record": number, "errors": {"json": [str(record)]}})
+            else:
+                candidates.append((number, record))
+
+        try:
+            # `pre_load` sanitizes in place, so load copies in case of a retry
+            rows = schema.load([dict(record) for _, record in candidates])
+        except ValidationError:
+            # marshmallow skips `post_load` (the excerpt) for every item once
+            # one fails, so load the records of a bad chunk one at a time
+            rows = []
+            for number, record in candidates:
+                try:
+                    rows.append(record_schema.load(record))
+                except ValidationError as err:
+                    summary["errors"].append({"record": number, "errors": err.messages})
+
+        if rows:
+            try:
+                _insert_chunk(rows)
+            except Exception as e:
+                db.session.rollback()
+                summary["errors"].append({"records": [chunk[0][0], chunk[-1][0]], "errors": {"database": [str(e)]}})
+                break
+            summary["imported"] += len(rows)
+            bump_tips_version()
+
+        summary["checkpoint"] = chunk[-1][0]
+        yield {"event": "progress", "checkpoint": summary["checkpoint"], "imported": summary["imported"],
+               "errors": len(summary["errors"])}
+
+    yield dict(summary, event="done")
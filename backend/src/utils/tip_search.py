@@ -0,0 +1,286 @@
+"""
+This module maintains and queries the full-text index over tips.
+
+The index stores the tip title, category and the plain text of the sanitized
+description, HTML-escaped so highlighted fragments are safe to render:
+
+- SQLite: an FTS5 table `tips_fts` keyed by tip id, ranked with bm25();
+- PostgreSQL: a `tips_search` table with a weighted tsvector and a GIN index,
+  ranked with ts_rank_cd();
+- other databases fall back to an unranked LIKE scan.
+
+Admin writes call `index_tip()` / `remove_tip()` before committing, so the
+index changes in the same transaction as the tip.
+
+Functions:
+- ensure_search_index(): Create the index structures and backfill them.
+- rebuild_search_index(): Re-index every tip.
+- index_tip(tip): Insert or refresh one tip in the index.
+- index_new_tips(tips): Add freshly inserted tips in one batch.
+- remove_tip(tip_id): Drop one tip from the index.
+- remove_tips(tip_ids): Drop several tips from the index in one statement.
+- search_tips(query, page, limit): Ranked, highlighted, paginated search.
+"""
+
+import html
+import math
+import re
+
+from sqlalchemy import text, or_, bindparam
+
+from src import db
+from src.models import Tip
+
+MARK_START, MARK_END = "<mark>", "</mark>"
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tips_fts USING fts5("
+    "title, category, body, tokenize = 'porter unicode61')",
+]
+_POSTGRES_DDL = [
+    "CREATE TABLE IF NOT EXISTS tips_search ("
+    "tip_id INTEGER PRIMARY KEY REFERENCES tips (id) ON DELETE CASCADE, "
+    "title TEXT NOT NULL, category TEXT NOT NULL, body TEXT NOT NULL, "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_tips_search_document ON tips_search USING GIN (document)",
+]
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def _document(tip):
+    """Return the escaped plain-text fields indexed for a tip."""
+    import bleach
+
+    return {
+        "tip_id": tip.id,
+        "title": html.escape(tip.title or "", quote=False),
+        "category": html.escape(tip.category or "", quote=False),
+        "body": bleach.clean(tip.description or "", tags=[], strip=True),
+    }
+
+
+def ensure_search_index():
+    """Create the index structures if needed and backfill an empty index."""
+    dialect = _dialect()
+    if dialect == "sqlite":
+        ddl, table = _SQLITE_DDL, "tips_fts"
+    elif dialect == "postgresql":
+        ddl, table = _POSTGRES_DDL, "tips_search"
+    else:
+        return
+    for statement in ddl:
+        db.session.execute(text(statement))
+    indexed = db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    if not indexed and db.session.query(Tip.id).first():
+        rebuild_search_index()
+    db.session.commit()
+
+
+def rebuild_search_index():
+    """Re-index every tip. The caller commits."""
+    dialect = _dialect()
+    if dialect == "sqlite":
+        db.session.execute(text("DELETE FROM tips_fts"))
+    elif dialect == "postgresql":
+        db.session.execute(text("DELETE FROM tips_search"))
+    else:
+        return
+    batch = []
+    for tip in Tip.query.yield_per(500):
+        batch.append(tip)
+        if len(batch) == 500:
+            index_new_tips(batch)
+            batch = []
+    index_new_tips(batch)
+
+
+def index_tip(tip):
+    """
+    Insert or refresh a tip in the index. The caller commits.
+
+    :param tip: A flushed Tip instance (its id must be set)
+    """
+    dialect = _dialect()
+    if dialect == "sqlite":
+        db.session.execute(text("DELETE FROM tips_fts WHERE rowid = :tip_id"), {"tip_id": tip.id})
+        db.session.execute(text(
+            "INSERT INTO tips_fts (rowid, title, category, body) "
+            "VALUES (:tip_id, :title, :category, :body)"
+        ), _document(tip))
+    elif dialect == "postgresql":
+        db.session.execute(text(
+            "INSERT INTO tips_search (tip_id, title, category, body, document) "
+            "VALUES (:tip_id, :title, :category, :body, "
+            "setweight(to_tsvector('english', :title), 'A') || "
+            "setweight(to_tsvector('english', :category), 'B') || "
+            "setweight(to_tsvector('english', :body), 'C')) "
+            "ON CONFLICT (tip_id) DO UPDATE SET title = EXCLUDED.title, "
+            "category = EXCLUDED.category, body = EXCLUDED.body, document = EXCLUDED.document"
+        ), _document(tip))
+
+
+def index_new_tips(tips):
+    """
+    Add tips that are not indexed yet with a single executemany. The caller
+    commits.
+
+    :param tips: Tip-like objects with their ids set
+    """
+    documents = [_document(tip) for tip in tips]
+    if not documents:
+        return
+    dialect = _dialect()
+    if dialect == "sqlite":
+        db.session.execute(text(
+            "INSERT INTO tips_fts (rowid, title, category, body) "
+            "VALUES (:tip_id, :title, :category, :body)"
+        ), documents)
+    elif dialect == "postgresql":
+        db.session.execute(text(
+            "INSERT INTO tips_search (tip_id, title, category, body, document) "
+            "VALUES (:tip_id, :title, :category, :body, "
+            "setweight(to_tsvector('english', :title), 'A') || "
+            "setweight(to_tsvector('english', :category), 'B') || "
+            "setweight(to_tsvector('english', :body), 'C'))"
+        ), documents)
+
+
+def remove_tip(tip_id):
+    """
+    Drop a tip from the index. The caller commits.
+
+    :param tip_id: The tip's primary key
+    """
+    dialect = _dialect()
+    if dialect == "sqlite":
+        db.session.execute(text("DELETE FROM tips_fts WHERE rowid = :tip_id"), {"tip_id": tip_id})
+    elif dialect == "postgresql":
+        db.session.execute(text("DELETE FROM tips_search WHERE tip_id = :tip_id"), {"tip_id": tip_id})
+
+
+def remove_tips(tip_ids):
+    """
+    Drop several tips from the index in one statement. The caller commits.
+
+    :param tip_ids: Iterable of tip primary keys
+    """
+    tip_ids = list(tip_ids)
+    if not tip_ids:
+        return
+    dialect = _dialect()
+    if dialect == "sqlite":
+        statement = text("DELETE FROM tips_fts WHERE rowid IN :tip_ids")
+    elif dialect == "postgresql":
+        statement = text("DELETE FROM tips_search WHERE tip_id IN :tip_ids")
+    else:
+        return
+    db.session.execute(statement.bindparams(bindparam("tip_ids", expanding=True)), {"tip_ids": tip_ids})
+
+
+def _fts5_query(query):
+    """Turn free text into a safe FTS5 query: all terms, last one as a prefix."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _search_sqlite(query, limit, offset):
+    match = _fts5_query(query)
+    if not match:
+        return 0, []
+    params = {"match": match, "limit": limit, "offset": offset}
+    total = db.session.execute(text(
+        "SELECT COUNT(*) FROM tips_fts JOIN tips ON tips.id = tips_fts.rowid "
+        "WHERE tips_fts MATCH :match AND tips.is_active"
+    ), params).scalar()
+    rows = db.session.execute(text(
+        "SELECT tips.id, tips.created_at, tips.image, tips.category, "
+        f"highlight(tips_fts, 0, '{MARK_START}', '{MARK_END}') AS title, "
+        f"snippet(tips_fts, 2, '{MARK_START}', '{MARK_END}', '…', 24) AS excerpt, "
+        "bm25(tips_fts, 10.0, 4.0, 1.0) AS score "
+        "FROM tips_fts JOIN tips ON tips.id = tips_fts.rowid "
+        "WHERE tips_fts MATCH :match AND tips.is_active "
+        "ORDER BY score LIMIT :limit OFFSET :offset"
+    ).columns(created_at=db.DateTime), params).mappings().all()
+    # bm25() is lower-is-better; expose a higher-is-better rank
+    return total, [dict(row, rank=-row["score"]) for row in rows]
+
+
+def _search_postgres(query, limit, offset):
+    params = {"query": query, "limit": limit, "offset": offset}
+    total = db.session.execute(text(
+        "SELECT COUNT(*) FROM tips_search JOIN tips ON tips.id = tips_search.tip_id "
+        "WHERE tips_search.document @@ websearch_to_tsquery('english', :query) AND tips.is_active"
+    ), params).scalar()
+    options = f"StartSel={MARK_START}, StopSel={MARK_END}"
+    rows = db.session.execute(text(
+        "SELECT tips.id, tips.created_at, tips.image, tips.category, "
+        f"ts_headline('english', s.title, q, 'HighlightAll=true, {options}') AS title, "
+        f"ts_headline('english', s.body, q, 'MaxWords=35, MinWords=15, {options}') AS excerpt, "
+        "ts_rank_cd(s.document, q) AS rank "
+        "FROM tips_search AS s JOIN tips ON tips.id = s.tip_id, "
+        "websearch_to_tsquery('english', :query) AS q "
+        "WHERE s.document @@ q AND tips.is_active "
+        "ORDER BY rank DESC, tips.id DESC LIMIT :limit OFFSET :offset"
+    ), params).mappings().all()
+    return total, [dict(row) for row in rows]
+
+
+def _search_fallback(query, limit, offset):
+    pattern = f"%{query}%"
+    matches = Tip.query.filter(Tip.is_active.is_(True)).filter(
+        or_(Tip.title.ilike(pattern), Tip.category.ilike(pattern), Tip.description.ilike(pattern)))
+    total = matches.count()
+    rows = matches.order_by(Tip.created_at.desc(), Tip.id.desc()).limit(limit).offset(offset).all()
+    results = []
+    for tip in rows:
+        document = _document(tip)
+        # Cut the plain text, not the escaped body, so no entity is split in half
+        excerpt = html.escape(html.unescape(document["body"])[:200], quote=False)
+        results.append(dict(document, id=tip.id, created_at=tip.created_at, image=tip.image,
+                            category=tip.category, excerpt=excerpt, rank=0))
+    return total, results
+
+
+def search_tips(query, page=1, limit=20):
+    """
+    Search active tips, best matches first.
+
+    :param query: Free-text search query
+    :param page: 1-based page number
+    :param limit: Results per page
+    :return: Response dict with pagination metadata and highlighted results
+    """
+    offset = (page - 1) * limit
+    dialect = _dialect()
+    if dialect == "sqlite":
+        total, rows = _search_sqlite(query, limit, offset)
+    elif dialect == "postgresql":
+        total, rows = _search_postgres(query, limit, offset)
+    else:
+        total, rows = _search_fallback(query, limit, offset)
+
+    return {
+        "page": page,
+        "limit": limit,
+        "total_items": total,
+        "total_pages": math.ceil(total / limit),
+        "data": [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "excerpt": row["excerpt"],
+                "category": row["category"],
+                "image": row["image"],
+                "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                "rank": row["rank"],
+            }
+            for row in rows
+        ],
+    }
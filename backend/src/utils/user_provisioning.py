@@ -0,0 +1,111 @@
+"""
+This module provisions users in bulk from NDJSON input (one JSON object per
+line with `name`, `email`, `password` and an optional `role`).
+
+The input is consumed line by line and processed in chunks. Each chunk costs
+one query for email uniqueness, one parallel hashing pass, one multi-row
+insert into `users`, one into `user_roles`, and a single commit.
+
+Functions:
+- provision_users(lines, chunk_size): Provision users and return a summary.
+"""
+
+import json
+from itertools import islice
+
+from marshmallow import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from src import db, password_hasher
+from src.models.users import User, Role, UserRole
+from src.schemas.user import UserProvisionSchema
+
+
+def _parse(lines, schema):
+    """Yield `(line_no, record, errors)` for every non-blank input line."""
+    for line_no, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, schema.load(json.loads(line)), None
+        except ValueError as e:
+            yield line_no, None, {"json": [str(e)]}
+        except ValidationError as err:
+            yield line_no, None, err.messages
+
+
+def _insert_chunk(records, role_ids):
+    """Insert one chunk of validated records in a single transaction."""
+    users = User.__table__
+    hashes = password_hasher.hash_many(record["password"] for _, record in records)
+    rows = [
+        {"name": record["name"], "email": record["email"], "password": hashed}
+        for (_, record), hashed in zip(records, hashes)
+    ]
+    inserted = db.session.execute(insert(users).returning(users.c.id, users.c.email), rows)
+    ids = {email: user_id for user_id, email in inserted}
+    db.session.execute(insert(UserRole.__table__), [
+        {"user_id": ids[record["email"]], "role_id": role_ids[record["role"]]}
+        for _, record in records
+    ])
+    db.session.commit()
+
+
+def provision_users(lines, chunk_size=500):
+    """
+    Provision users from an iterable of NDJSON lines.
+
+    Chunks are committed independently, so a failure in one chunk does not
+    undo users created by earlier chunks.
+
+    :param lines: Iterable of str or bytes lines
+    :param chunk_size: Number of input lines handled per transaction
+    :return: Summary dict with `created`, `skipped` and `errors`
+    """
+    schema = UserProvisionSchema()
+    role_ids = {slug: role_id for role_id, slug in db.session.query(Role.id, Role.slug)}
+    summary = {"created": 0, "skipped": [], "errors": []}
+    seen = set()
+
+    parsed = _parse(lines, schema)
+    while True:
+        chunk = list(islice(parsed, chunk_size))
+        if not chunk:
+            break
+
+        records = []
+        for line_no, record, errors in chunk:
+            if errors:
+                summary["errors"].append({"line": line_no, "errors": errors})
+            elif record["email"] in seen:
+                summary["skipped"].append({"line": line_no, "email": record["email"], "reason": "duplicate in input"})
+            else:
+                seen.add(record["email"])
+                records.append((line_no, record))
+        if not records:
+            continue
+
+        emails = [record["email"] for _, record in records]
+        existing = {email for (email,) in db.session.query(User.email).filter(User.email.in_(emails))}
+        for line_no, record in records:
+            if record["email"] in existing:
+                summary["skipped"].append({"line": line_no, "email": record["email"], "reason": "already exists"})
+        records = [(line_no, record) for line_no, record in records if record["email"] not in existing]
+        if not records:
+            continue
+
+        try:
+            _insert_chunk(records, role_ids)
+            summary["created"] += len(records)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            summary["errors"].append({
+                "lines": [records[0][0], records[-1][0]],
+                "errors": {"database": [str(e.__cause__ or e)]},
+            })
+
+    return summary
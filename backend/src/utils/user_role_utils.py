@@ -1,5 +1,4 @@
 from src.models import *
-from src import pwd_context
 from src import db
 import os
 from dotenv import load_dotenv
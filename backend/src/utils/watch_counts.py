@@ -0,0 +1,158 @@
+"""
+This module maintains per-coin watcher counts.
+
+`coin_watch_counts` holds one row per coin with the number of users watching
+it. Watchlist writes adjust the counts inside their own transaction, so the
+table never has to be recomputed with a GROUP BY over `watchlist`; the
+callers commit. `rebuild_watch_counts` recomputes everything once, for
+databases that had watchlists before the table existed.
+
+Counting relies on `uq_watchlist_user_coin`, which `create_all` does not add
+to a `watchlist` table created before it. `ensure_watchlist_unique_index`
+(run by `flask init-db`) removes duplicate rows and creates it; until then
+watchlist inserts skip existing coins with a lookup instead of ON CONFLICT.
+
+Functions:
+- increment_watch_counts(coin_ids): Add one watcher to each coin.
+- decrement_watch_counts(coin_ids): Remove one watcher from each coin.
+- most_watched(limit): Most watched coins, cached briefly.
+- rebuild_watch_counts(): Recompute every count from `watchlist`.
+- has_watchlist_unique_index(): Whether `watchlist` has its unique index.
+- ensure_watchlist_unique_index(): De-duplicate `watchlist` and create it.
+"""
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, inspect, select, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src import db, cache
+from src.models.users import CoinWatchCount, Watchlist
+
+
+def increment_watch_counts(coin_ids):
+    """
+    Add one watcher to each coin, creating missing rows.
+
+    :param coin_ids: Distinct coin IDs that gained a watcher
+    """
+    if not coin_ids:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = dialect_insert(CoinWatchCount).values([{"coin_id": coin_id, "watchers": 1} for coin_id in coin_ids])
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[CoinWatchCount.coin_id],
+            set_={"watchers": CoinWatchCount.watchers + 1},
+        ))
+        return
+
+    existing = set(db.session.scalars(select(CoinWatchCount.coin_id).where(CoinWatchCount.coin_id.in_(coin_ids))))
+    if existing:
+        db.session.execute(
+            update(CoinWatchCount).where(CoinWatchCount.coin_id.in_(existing))
+            .values(watchers=CoinWatchCount.watchers + 1).execution_options(synchronize_session=False)
+        )
+    missing = [coin_id for coin_id in coin_ids if coin_id not in existing]
+    if missing:
+        db.session.execute(insert(CoinWatchCount), [{"coin_id": coin_id, "watchers": 1} for coin_id in missing])
+
+
+def decrement_watch_counts(coin_ids):
+    """
+    Remove one watcher from each coin.
+
+    :param coin_ids: Distinct coin IDs that lost a watcher
+    """
+    if not coin_ids:
+        return
+    db.session.execute(
+        update(CoinWatchCount).where(CoinWatchCount.coin_id.in_(coin_ids))
+        .values(watchers=CoinWatchCount.watchers - 1).execution_options(synchronize_session=False)
+    )
+
+
+def most_watched(limit=10):
+    """
+    Return the most watched coins, most watchers first.
+
+    :param limit: Number of coins
+    :return: List of dicts with `coin_id` and `watchers`
+    """
+    cache_key = f"most_watched_{limit}"
+    coins = cache.get(cache_key)
+    if coins is None:
+        rows = db.session.execute(
+            select(CoinWatchCount.coin_id, CoinWatchCount.watchers)
+            .where(CoinWatchCount.watchers > 0)
+            .order_by(CoinWatchCount.watchers.desc(), CoinWatchCount.coin_id)
+            .limit(limit)
+        )
+        coins = [{"coin_id": coin_id, "watchers": watchers} for coin_id, watchers in rows]
+        cache.set(cache_key, coins, timeout=current_app.config["MOST_WATCHED_CACHE_TIMEOUT"])
+    return coins
+
+
+def rebuild_watch_counts():
+    """
+    Recompute every watcher count from `watchlist`. The caller commits.
+
+    :return: Number of coins with at least one watcher
+    """
+    db.session.execute(delete(CoinWatchCount))
+    result = db.session.execute(
+        insert(CoinWatchCount).from_select(
+            ["coin_id", "watchers"],
+            select(Watchlist.coin_id, func.count()).where(Watchlist.coin_id.isnot(None)).group_by(Watchlist.coin_id),
+        )
+    )
+    return result.rowcount
+
+
+# Engine URL -> whether its `watchlist` table has the unique index, per process
+_unique_index = {}
+
+
+def _find_unique_index():
+    inspector = inspect(db.engine)
+    columns = {"user_id", "coin_id"}
+    return (any(set(uc["column_names"]) == columns for uc in inspector.get_unique_constraints("watchlist"))
+            or any(ix["unique"] and set(ix["column_names"]) == columns for ix in inspector.get_indexes("watchlist")))
+
+
+def has_watchlist_unique_index():
+    """
+    Whether `watchlist` has a unique index on (user_id, coin_id). Checked once
+    per process; restart workers after `flask init-db` to pick it up.
+
+    :return: True if ON CONFLICT on that pair is reliable
+    """
+    key = str(db.engine.url)
+    if key not in _unique_index:
+        _unique_index[key] = _find_unique_index()
+    return _unique_index[key]
+
+
+def ensure_watchlist_unique_index():
+    """
+    Create `uq_watchlist_user_coin` if the table predates it, first deleting
+    duplicate (user_id, coin_id) rows, keeping the oldest, and recomputing
+    the counts they inflated. The caller commits.
+
+    :return: Number of duplicate rows deleted
+    """
+    if _find_unique_index():
+        return 0
+    keep = select(func.min(Watchlist.id).label("id")).group_by(Watchlist.user_id, Watchlist.coin_id).subquery()
+    deleted = db.session.execute(
+        delete(Watchlist).where(
+            Watchlist.user_id.isnot(None), Watchlist.coin_id.isnot(None),
+            Watchlist.id.notin_(select(keep.c.id)),
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.execute(text("CREATE UNIQUE INDEX uq_watchlist_user_coin ON watchlist (user_id, coin_id)"))
+    if deleted:
+        rebuild_watch_counts()
+    _unique_index.pop(str(db.engine.url), None)
+    return deleted
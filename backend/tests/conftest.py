@@ -0,0 +1,84 @@
+"""
+Shared fixtures: an app on a throwaway SQLite database, its test client, a
+market listing and a SQL query budget.
+
+The environment is set before `src` is imported, since the config classes
+read it at import time.
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="cm_tests_")
+_db_path = os.path.join(_tmp, "test.db")
+os.environ.update({
+    "FLASK_ENV": "testing",
+    "TEST_DATABASE_URL": f"sqlite:///{_db_path}",
+    "MARKET_SNAPSHOT_PATH": os.path.join(_tmp, "market_snapshot.bin"),
+    "SECRET_KEY": "test-secret",
+    "JWT_SECRET_KEY": "test-jwt-secret",
+    "ADMIN_NAME": "admin",
+    "ADMIN_EMAIL": "admin@example.com",
+    "ADMIN_PASSWORD": "Adm1n!pass",
+    "FRONTEND_URL": "http://localhost:3000",
+})
+
+from src import create_app, db, init_database  # noqa: E402
+from src.config import config  # noqa: E402
+from src.utils.market_snapshot import MarketSnapshot, encode_snapshot  # noqa: E402
+from src.utils.sql_profiler import assert_max_queries  # noqa: E402
+
+
+@pytest.fixture
+def config_overrides():
+    """Testing config values to change before the app is created; override per module."""
+    return {}
+
+
+@pytest.fixture
+def app(config_overrides, monkeypatch):
+    for key, value in config_overrides.items():
+        monkeypatch.setattr(config["testing"], key, value)
+    app = create_app()
+    with app.app_context():
+        init_database()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+    # Also drops what `create_all` does not know about, such as the search index
+    os.remove(_db_path)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def listing(app):
+    """A fresh 200-coin market listing, served without calling CoinMarketCap."""
+    from src import market_listing
+
+    items = [{
+        "id": i, "cmc_rank": i, "name": f"Coin {i}", "symbol": f"C{i}", "slug": f"coin-{i}",
+        "circulating_supply": 1e6,
+        "quote": {"USD": {"price": 1000.0 / i, "volume_24h": 1e6, "percent_change_1h": 0.5,
+                          "percent_change_24h": -1.5, "percent_change_7d": 3.0, "market_cap": 1e9 / i}},
+    } for i in range(1, 201)]
+    market_listing.snapshot = MarketSnapshot(encode_snapshot(items, total_count=len(items), fetched_at=time.time()))
+    yield market_listing.snapshot
+    market_listing.snapshot = None
+
+
+@pytest.fixture
+def max_queries():
+    """
+    `assert_max_queries` as a fixture:
+
+        with max_queries(3):
+            client.get("/api/v1/auth/me", headers=headers)
+    """
+    return assert_max_queries
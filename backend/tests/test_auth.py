@@ -0,0 +1,14 @@
+import os
+
+
+def test_me_stays_within_its_query_budget(client, max_queries):
+    response = client.post("/api/v1/auth/login", json={
+        "email": os.environ["ADMIN_EMAIL"], "password": os.environ["ADMIN_PASSWORD"]})
+    headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+    # Blocklist check, user, admin role
+    with max_queries(3):
+        response = client.get("/api/v1/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["email"] == os.environ["ADMIN_EMAIL"]
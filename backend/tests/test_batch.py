@@ -0,0 +1,62 @@
+import time
+
+from flask import g
+
+from src import batch_dispatcher
+from src.utils.batch import BatchIdentity, batch_identity
+from src.utils.sql_profiler import record_queries
+
+
+def _login(client):
+    response = client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "Adm1n!pass"})
+    return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+
+def _batch(client, paths, headers=None):
+    return client.post("/api/v1/batch", headers=headers,
+                       json={"requests": [{"id": str(i), "path": path} for i, path in enumerate(paths)]})
+
+
+def test_token_is_verified_once_per_batch(client):
+    headers = _login(client)
+    with record_queries() as log:
+        response = _batch(client, ["/api/v1/auth/me"] * 3, headers)
+
+    assert [sub["status"] for sub in response.get_json()["responses"]] == [200, 200, 200]
+    blocklist_checks = [sql for sql, _, _ in log.entries if "token_blocklist" in sql]
+    assert len(blocklist_checks) == 1
+
+
+def test_blocklist_is_skipped_only_for_the_batch_token(app):
+    with app.test_request_context("/api/v1/auth/me"):
+        g._batch_identity = BatchIdentity("batch-jti", None)
+        assert batch_identity({"jti": "batch-jti"}) is g._batch_identity
+        assert batch_identity({"jti": "other-jti"}) is None
+
+
+def test_nested_batch_is_rejected(client):
+    response = _batch(client, ["/api/v1/batch"])
+    assert response.status_code == 400
+    assert "nested" in str(response.get_json())
+
+
+def test_mixed_statuses_come_back_in_request_order(client):
+    headers = _login(client)
+    response = _batch(client, ["/api/v1/auth/me", "/api/v1/no-such-route", "/api/v1/coins/most-watched?limit=0"],
+                      headers)
+
+    results = response.get_json()["responses"]
+    assert [(sub["id"], sub["status"]) for sub in results] == [("0", 200), ("1", 404), ("2", 400)]
+    assert results[0]["body"]["email"] == "admin@example.com"
+
+
+def test_slow_sub_request_times_out_alone(app, client):
+    app.add_url_rule("/api/v1/slow", "slow", lambda: time.sleep(1) or {"slow": True})
+    app.config.update(BATCH_WORKERS=2, BATCH_TIMEOUT=0.2)
+    batch_dispatcher.init_app(app)
+
+    start = time.monotonic()
+    response = _batch(client, ["/api/v1/slow", "/api/v1/coins/most-watched"])
+
+    assert time.monotonic() - start < 1
+    assert [sub["status"] for sub in response.get_json()["responses"]] == [504, 200]
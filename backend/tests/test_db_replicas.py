@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+from flask import g
+from sqlalchemy import func, select
+
+from src import cache, db
+from src.models import Tip
+from src.utils.db_replicas import PIN_COOKIE, ReplicaRouter
+
+
+def _tip(title):
+    return Tip(title=title, description="<p>Body</p>", image="https://example.com/tip.png")
+
+
+def _count_tips():
+    return db.session.scalar(select(func.count()).select_from(Tip))
+
+
+@pytest.fixture
+def replica_uri(app, tmp_path):
+    """A replica snapshot of the primary, taken before any tip was written."""
+    path = tmp_path / "replica.db"
+    primary = sqlite3.connect(app.config["SQLALCHEMY_DATABASE_URI"].removeprefix("sqlite:///"))
+    with sqlite3.connect(path) as replica:
+        primary.backup(replica)
+    primary.close()
+    db.session.add(_tip("Primary only"))
+    db.session.commit()
+    return f"sqlite:///{path}"
+
+
+def _router(app, *uris):
+    app.config["SQLALCHEMY_REPLICA_URIS"] = list(uris)
+    return ReplicaRouter(cache, app)
+
+
+def test_get_selects_run_on_the_replica(app, replica_uri):
+    router = _router(app, replica_uri)
+    with app.test_request_context("/api/v1/tips"):
+        router._choose_bind()
+        assert g._db_replica is router.replicas[0].engine
+        assert _count_tips() == 0
+
+
+def test_write_in_a_get_sends_later_reads_to_the_primary(app, replica_uri):
+    router = _router(app, replica_uri)
+    with app.test_request_context("/api/v1/tips"):
+        router._choose_bind()
+        db.session.add(_tip("Written in a GET"))
+        db.session.flush()
+        assert _count_tips() == 2
+        db.session.rollback()
+
+
+def test_post_pins_the_caller_to_the_primary(app, client, replica_uri):
+    router = _router(app, replica_uri)
+    response = client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "Adm1n!pass"})
+    assert response.status_code == 200
+    assert PIN_COOKIE in response.headers["Set-Cookie"]
+
+    with app.test_request_context("/api/v1/tips", headers={"Cookie": f"{PIN_COOKIE}=1"}):
+        router._choose_bind()
+        assert g.get("_db_replica") is None
+        assert _count_tips() == 1
+
+
+def test_reads_fall_back_to_the_primary_without_a_healthy_replica(app, tmp_path):
+    router = _router(app, f"sqlite:///{tmp_path}/missing/replica.db")
+    with app.test_request_context("/api/v1/tips"):
+        router._choose_bind()
+        assert g._db_replica is None
+        assert not router.replicas[0].healthy
+        db.session.add(_tip("Primary"))
+        db.session.commit()
+        assert _count_tips() == 1
@@ -0,0 +1,28 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def config_overrides():
+    return {"PROXY_COUNT": 1, "LOGIN_THROTTLE_IP_LIMIT": 2, "LOGIN_THROTTLE_EMAIL_LIMIT": 2}
+
+
+def _login(client, email, client_ip):
+    return client.post("/api/v1/auth/login", json={"email": email, "password": "Wr0ng!pass"},
+                       headers={"X-Forwarded-For": client_ip})
+
+
+def test_clients_behind_the_proxy_get_their_own_bucket(client):
+    statuses = [_login(client, f"user{i}@example.com", "203.0.113.7").status_code for i in range(3)]
+    assert statuses[-1] == 429
+    assert _login(client, "other@example.com", "198.51.100.9").status_code != 429
+
+
+def test_throttled_email_is_not_logged_in_clear(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="src.utils.login_throttle"):
+        statuses = [_login(client, "victim@example.com", f"198.51.100.{i}").status_code for i in range(3)]
+
+    assert statuses[-1] == 429
+    assert "Login throttled: email=" in caplog.text
+    assert "victim@example.com" not in caplog.text
@@ -0,0 +1,24 @@
+from src.utils.market_overview import compute_overview
+from src.utils.market_snapshot import MarketSnapshot, encode_snapshot
+
+
+def _coin(coin_id, change, **quote):
+    return {
+        "id": coin_id, "cmc_rank": coin_id, "name": f"Coin {coin_id}", "symbol": f"C{coin_id}",
+        "slug": f"coin-{coin_id}", "circulating_supply": 1e6,
+        "quote": {"USD": {
+            "price": 10.0, "volume_24h": 1e7, "percent_change_1h": change, "percent_change_24h": change,
+            "percent_change_7d": change, "market_cap": 1e9, **quote,
+        }},
+    }
+
+
+def test_movers_skip_coins_missing_a_displayed_field():
+    items = [_coin(1, 5.0), _coin(2, 50.0, percent_change_1h=None), _coin(3, -5.0)]
+    snapshot = MarketSnapshot(encode_snapshot(items, total_count=3, fetched_at=0))
+
+    movers = compute_overview(snapshot, top_n=3, min_volume=0)["movers"]
+
+    for period in ("1h", "24h", "7d"):
+        assert [coin["id"] for coin in movers[period]["gainers"]] == [1, 3]
+        assert [coin["id"] for coin in movers[period]["losers"]] == [3, 1]
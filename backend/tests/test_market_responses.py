@@ -0,0 +1,28 @@
+import gzip
+import json
+
+from src.routes import main
+
+
+def test_home_page_is_cached_precompressed(client, listing, monkeypatch):
+    response = client.get("/api/v1/?limit=100", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    body = json.loads(gzip.decompress(response.get_data()))
+    assert len(body["data"]["data"]) == 100
+
+    def fail(*args):
+        raise AssertionError("cached page rendered again")
+
+    monkeypatch.setattr(main, "transform_data", fail)
+    cached = client.get("/api/v1/?limit=100", headers={"Accept-Encoding": "gzip"})
+    assert cached.get_data() == response.get_data()
+    assert client.get("/api/v1/?limit=100").get_json() == body
+
+
+def test_cached_bodies_vary_by_format_and_layout(client, listing):
+    rows = client.get("/api/v1/search?q=coin 1").get_json()
+    columnar = client.get("/api/v1/search?q=coin 1&layout=columnar").get_json()
+
+    assert rows["total_results"] == columnar["total_results"]
+    assert [coin["id"] for coin in rows["data"]["data"]] == columnar["data"]["data"]["id"]
+    assert client.get("/api/v1/search?q=coin 1").get_json() == rows
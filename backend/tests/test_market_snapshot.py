@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from src.utils.market_snapshot import MarketSnapshot, encode_snapshot, load_snapshot, write_snapshot
+
+ITEMS = [
+    {"id": 1, "cmc_rank": 1, "name": "Bitcoin", "symbol": "BTC", "slug": "bitcoin", "circulating_supply": 19.5e6,
+     "quote": {"USD": {"price": 60000.5, "volume_24h": 3e10, "percent_change_1h": -0.25, "percent_change_24h": 1.5,
+                       "percent_change_7d": 4.0, "market_cap": 1.2e12, "market_cap_dominance": 52.1}}},
+    {"id": 2, "cmc_rank": 2, "name": "Ünïcode ☃", "symbol": "", "slug": "", "circulating_supply": None,
+     "quote": {"USD": {"price": 0.5, "volume_24h": None, "percent_change_1h": None}}},
+]
+
+
+def test_items_round_trip():
+    snapshot = MarketSnapshot(encode_snapshot(ITEMS, total_count=9000, fetched_at=1700000000.5))
+
+    assert (len(snapshot), snapshot.total_count, snapshot.fetched_at) == (2, 9000, 1700000000.5)
+    first, second = snapshot.items()
+    assert first == ITEMS[0]
+    assert (second["name"], second["symbol"], second["slug"]) == ("Ünïcode ☃", "", "")
+    assert second["circulating_supply"] is None
+    assert second["quote"]["USD"]["price"] == 0.5
+    assert second["quote"]["USD"]["volume_24h"] is None
+    assert second["quote"]["USD"]["market_cap"] is None  # Absent upstream
+    assert math.isnan(snapshot.column("volume_24h")[1])
+
+
+def test_empty_listing_round_trips():
+    snapshot = MarketSnapshot(encode_snapshot([], total_count=0, fetched_at=0))
+    assert len(snapshot) == 0
+    assert snapshot.items() == []
+
+
+@pytest.mark.parametrize("keep", [0, 10, 40, 200, -1])
+def test_truncated_snapshot_is_rejected(tmp_path, keep):
+    data = encode_snapshot(ITEMS, total_count=2, fetched_at=0)
+    with pytest.raises(ValueError):
+        MarketSnapshot(data[:keep])
+
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, data[:keep])
+    assert load_snapshot(path) is None
+
+
+def test_written_snapshot_loads_back(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, encode_snapshot(ITEMS, total_count=2, fetched_at=0))
+    assert load_snapshot(path).items() == MarketSnapshot(encode_snapshot(ITEMS, 2, 0)).items()
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src import db
+from src.utils.sql_profiler import record_queries
+
+
+def test_metrics_are_disabled_without_a_token(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_require_the_token(app, client):
+    app.config["METRICS_TOKEN"] = "s3cret"
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_metrics_can_be_public(app, client):
+    app.config["METRICS_PUBLIC"] = True
+    assert client.get("/metrics").status_code == 200
+
+
+def test_failed_statements_leave_no_start_times(app):
+    with app.app_context(), record_queries():
+        with db.engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM no_such_table"))
+            assert not connection.info.get("_metrics_start")
+            assert not connection.info.get("_profiler_start")
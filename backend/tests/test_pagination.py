@@ -0,0 +1,28 @@
+from src import db
+from src.models import Tip
+
+
+def _add_tips(app, count):
+    with app.app_context():
+        db.session.add_all(Tip(title=f"Tip {i}", description=f"Body {i}", category="general", is_active=True)
+                           for i in range(count))
+        db.session.commit()
+
+
+def test_limit_is_capped(app, client):
+    _add_tips(app, 105)
+    body = client.get("/api/v1/tips?page=1&limit=1000").get_json()
+    assert body["limit"] == 100
+    assert len(body["data"]) == 100
+    assert body["total_pages"] == 2
+
+    body = client.get("/api/v1/tips?cursor=&limit=1000").get_json()
+    assert len(body["data"]) == 100
+    assert body["next_cursor"]
+
+
+def test_malformed_numbers_are_bad_requests(client):
+    for query in ("limit=ten", "page=2.5", "limit=0", "cursor=&limit=x"):
+        response = client.get(f"/api/v1/tips?{query}")
+        assert response.status_code == 400, query
+        assert "error" in response.get_json()
@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+
+from flask import Flask
+
+from src.utils.password_hasher import PasswordHasher
+
+
+class SlowContext:
+    """Stands in for the CryptContext: records where and how concurrently it hashes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        self.threads = {}
+
+    def hash(self, password):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.threads[password] = threading.current_thread().name
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return f"hashed:{password}"
+
+
+def _hasher(workers):
+    app = Flask(__name__)
+    app.config.update(PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_MAX_PENDING=32)
+    context = SlowContext()
+    return PasswordHasher(context=context, app=app), context
+
+
+def _login_during_bulk(hasher, count):
+    bulk = threading.Thread(target=hasher.hash_many, args=[[str(i) for i in range(count)]], name="bulk")
+    bulk.start()
+    time.sleep(0.02)
+    start = time.monotonic()
+    assert hasher.hash("login") == "hashed:login"
+    elapsed = time.monotonic() - start
+    bulk.join()
+    return elapsed
+
+
+def test_bulk_jobs_use_half_the_workers():
+    hasher, context = _hasher(workers=4)
+    assert hasher.hash_many(["a", "b", "c", "d", "e", "f"]) == [f"hashed:{p}" for p in "abcdef"]
+    assert context.peak == 2
+    assert _login_during_bulk(hasher, 8) < 0.09  # A free thread: no waiting behind bulk hashes
+
+
+def test_single_worker_is_never_taken_by_bulk_jobs():
+    hasher, context = _hasher(workers=1)
+    assert _login_during_bulk(hasher, 8) < 0.09
+    bulk_threads = {name for password, name in context.threads.items() if password != "login"}
+    assert bulk_threads == {"bulk"}  # Hashed in the caller; the one pool thread stays free
+    assert context.threads["login"].startswith("pwd-hash")
+
+
+def test_upload_of_existing_users_is_not_an_error(client):
+    token = client.post("/api/v1/auth/login", json={
+        "email": "admin@example.com", "password": "Adm1n!pass"}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    line = json.dumps({"name": "admin", "email": "admin@example.com", "password": "Adm1n!pass"})
+
+    response = client.post("/api/v1/admin/users/bulk", data=line + "\n", headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["skipped"][0]["reason"] == "already exists"
+
+    assert client.post("/api/v1/admin/users/bulk", data="not json\n", headers=headers).status_code == 400
@@ -0,0 +1,54 @@
+from sqlalchemy import text
+
+from src import db
+from src.models import PriceAlert, User
+from src.utils.price_alerts import PriceAlertIndex
+
+
+def _listing(price, coin_id=1):
+    return [{"id": coin_id, "quote": {"USD": {"price": price}}}]
+
+
+def _create_alert(index, direction, threshold):
+    alert = PriceAlert(user_id=User.query.first().id, coin_id=1, direction=direction, threshold=threshold)
+    db.session.add(alert)
+    db.session.commit()
+    index.add(alert)
+    return alert.id
+
+
+def test_alerts_fire_on_crossings_only(app):
+    index = PriceAlertIndex(app)
+    above = _create_alert(index, "above", 100)
+    below = _create_alert(index, "below", 90)
+
+    assert index.evaluate(_listing(105)) == []  # First price: the reference, not a crossing
+    assert index.evaluate(_listing(110)) == []  # Already above 100
+    assert index.evaluate(_listing(95)) == []
+    assert index.evaluate(_listing(100)) == [above]
+    assert index.evaluate(_listing(85)) == [below]
+    assert PriceAlert.query.filter_by(is_active=True).count() == 0
+    assert db.session.get(PriceAlert, above).triggered_price == 100
+
+
+def test_alert_created_in_another_worker_is_evaluated(app):
+    index = PriceAlertIndex(app)
+    assert index.evaluate(_listing(95)) == []
+
+    # Another worker creates an alert: only the database is shared
+    alert = PriceAlert(user_id=User.query.first().id, coin_id=1, direction="above", threshold=100)
+    db.session.add(alert)
+    db.session.execute(text("INSERT INTO cache_versions (name, version) VALUES ('price_alerts', 'other-worker')"))
+    db.session.commit()
+
+    assert index.evaluate(_listing(101)) == [alert.id]
+
+
+def test_evaluate_does_not_commit_the_callers_session(app):
+    index = PriceAlertIndex(app)
+    alert_id = _create_alert(index, "above", 100)
+    index.evaluate(_listing(95))
+    User.query.first()
+
+    assert index.evaluate(_listing(101)) == [alert_id]
+    assert db.session().in_transaction()
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+from src import db, init_database
+from src.models import Tip
+
+# `tips` as created before the excerpt and renditions columns existed
+LEGACY_TIPS = (
+    "CREATE TABLE tips (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, description TEXT NOT NULL, "
+    "category VARCHAR(100), created_at DATETIME, updated_at DATETIME, image VARCHAR(255), "
+    "is_active BOOLEAN)"
+)
+
+
+def test_init_database_upgrades_a_legacy_tips_table(app):
+    db.session.execute(text("DROP TABLE tips"))
+    db.session.execute(text(LEGACY_TIPS))
+    db.session.execute(text(
+        "INSERT INTO tips (title, description, image, is_active) "
+        "VALUES ('Old tip', '<p>Written before excerpts.</p>', 'https://example.com/tip.png', 1)"
+    ))
+    db.session.commit()
+
+    init_database()
+    init_database()  # Idempotent
+
+    tip = Tip.query.one()
+    assert tip.excerpt == "Written before excerpts."
+    assert tip.renditions is None
+    assert tip.thumbnail == "https://example.com/tip.png"
@@ -0,0 +1,17 @@
+from src import db
+from src.models import Tip
+from src.utils.tip_batch import apply_tip_operations
+
+
+def test_boolean_ids_are_rejected(app):
+    with app.app_context():
+        db.session.add_all([Tip(id=0, title="Zero", description="z", is_active=True),
+                            Tip(id=1, title="One", description="o", is_active=True)])
+        db.session.commit()
+
+        results, _ = apply_tip_operations([{"id": True, "action": "deactivate"},
+                                           {"id": False, "action": "delete"}])
+
+        assert [result["error"] for result in results] == ["id must be an integer"] * 2
+        assert db.session.get(Tip, 1).is_active is True
+        assert db.session.get(Tip, 0) is not None
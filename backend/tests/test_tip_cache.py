@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+from src import db
+from src.models import Tip
+
+
+def _add_tip(title):
+    db.session.add(Tip(title=title, description="<p>Body</p>", excerpt="Body", image="https://example.com/tip.png"))
+    db.session.commit()
+
+
+def _titles(client):
+    return [tip["title"] for tip in client.get("/api/v1/tips").get_json()["data"]]
+
+
+def test_bump_from_another_worker_invalidates_cached_tips(client):
+    _add_tip("First")
+    assert _titles(client) == ["First"]
+
+    # Another worker writes a tip and bumps the version: only the database is shared
+    _add_tip("Second")
+    assert _titles(client) == ["First"]
+    db.session.execute(text("INSERT INTO cache_versions (name, version) VALUES ('tips', 'other-worker')"))
+    db.session.commit()
+
+    assert _titles(client) == ["Second", "First"]
+
+
+def test_admin_write_invalidates_cached_tips(client):
+    from src.utils.tip_cache import bump_tips_version
+
+    _add_tip("First")
+    assert _titles(client) == ["First"]
+    _add_tip("Second")
+    bump_tips_version()
+
+    assert _titles(client) == ["Second", "First"]
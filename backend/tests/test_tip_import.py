@@ -0,0 +1,18 @@
+from src.models import Tip
+from src.utils.tip_import import import_tips
+
+
+def _tip(title):
+    return {"title": title, "description": f"<p>{title} explained.</p>", "image": "https://example.com/tip.png"}
+
+
+def test_chunk_with_invalid_record_imports_the_valid_ones(app):
+    records = [_tip("First tip"), _tip(""), _tip("Third tip")]
+
+    done = list(import_tips(records))[-1]
+
+    assert done["imported"] == 2
+    assert [error["record"] for error in done["errors"]] == [2]
+    tips = Tip.query.order_by(Tip.id).all()
+    assert [tip.title for tip in tips] == ["First tip", "Third tip"]
+    assert all(tip.excerpt for tip in tips)
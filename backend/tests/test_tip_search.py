@@ -0,0 +1,16 @@
+from src import db
+from src.models import Tip
+from src.utils.tip_search import _search_fallback
+
+
+def test_fallback_excerpt_never_splits_an_entity(app):
+    with app.app_context():
+        # The escaped body has "&amp;" straddling the 200-character cut
+        db.session.add(Tip(title="Fees", description="<p>" + "x" * 198 + "& more</p>",
+                           category="general", is_active=True))
+        db.session.commit()
+
+        total, results = _search_fallback("Fees", 20, 0)
+
+    assert total == 1
+    assert results[0]["excerpt"] == "x" * 198 + "&amp; "
@@ -0,0 +1,40 @@
+from sqlalchemy import text
+
+from src import db, init_database
+from src.models.users import CoinWatchCount, User, Watchlist
+from src.routes.user import add_to_watchlist
+from src.utils import watch_counts
+
+
+def _legacy_watchlist_table():
+    """Recreate `watchlist` as created before it had a unique index."""
+    db.session.execute(text("DROP TABLE watchlist"))
+    db.session.execute(text(
+        "CREATE TABLE watchlist (id INTEGER PRIMARY KEY AUTOINCREMENT, coin_id INTEGER, "
+        "user_id INTEGER REFERENCES users (id))"
+    ))
+    db.session.commit()
+    watch_counts._unique_index.clear()
+
+
+def _watchers():
+    return {row.coin_id: row.watchers for row in CoinWatchCount.query}
+
+
+def test_legacy_watchlist_skips_existing_coins_and_gets_its_index(app):
+    user_id = User.query.first().id
+    _legacy_watchlist_table()
+    db.session.execute(text("INSERT INTO watchlist (user_id, coin_id) VALUES (:u, 1), (:u, 1), (:u, 2)"),
+                       {"u": user_id})
+    watch_counts.rebuild_watch_counts()
+    db.session.commit()
+
+    assert not watch_counts.has_watchlist_unique_index()
+    assert add_to_watchlist(user_id, [2, 3]) == [3]
+
+    init_database()
+
+    assert watch_counts.has_watchlist_unique_index()
+    assert sorted(row.coin_id for row in Watchlist.query.filter_by(user_id=user_id)) == [1, 2, 3]
+    assert _watchers() == {1: 1, 2: 1, 3: 1}
+    assert add_to_watchlist(user_id, [1, 4]) == [4]
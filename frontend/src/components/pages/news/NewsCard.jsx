@@ -13,7 +13,7 @@ export default function NewsCard({ item, isDarkMode, truncateText }) {
             <figure className="w-1/3">
                 <Suspense fallback={<div className="h-full w-full bg-gray-300"></div>}>
                     <LazyImage
-                        src={item.image || "/default-news.jpg"}
+                        src={item.thumbnail || item.image || "/default-news.jpg"}
                         alt={item.title}
                         className="h-full w-full object-cover"
                     />
@@ -30,7 +30,7 @@ export default function NewsCard({ item, isDarkMode, truncateText }) {
                     className={`text-sm ${isDarkMode ? "text-gray-300" : "text-gray-600"
                         } text-left`}
                 >
-                    {truncateText(item.description, 100)}
+                    {truncateText(item.excerpt ?? item.description ?? "", 100)}
                 </p>
                 <div className="card-actions justify-end">
                     <Link